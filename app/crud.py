@@ -1,3 +1,4 @@
+from sqlalchemy.dialects.sqlite import insert
 from sqlalchemy.orm import Session
 from . import models, security
 from datetime import datetime, timedelta
@@ -15,6 +16,18 @@ def create_user(db: Session, email: str):
     db.refresh(db_user)
     return db_user
 
+def upsert_user_by_email(db: Session, email: str) -> int:
+    # One INSERT ... ON CONFLICT ... RETURNING round trip instead of a lookup
+    # followed by an insert. The no-op update makes RETURNING yield the id of an
+    # existing row as well.
+    stmt = insert(models.User).values(email=email, created_at=datetime.utcnow())
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[models.User.email], set_={"email": stmt.excluded.email}
+    ).returning(models.User.id)
+    user_id = db.execute(stmt).scalar_one()
+    db.commit()
+    return user_id
+
 def get_token_for_user(db: Session, user_id: int):
     return db.query(models.EbayOAuthToken).filter(models.EbayOAuthToken.user_id == user_id).first()
 
@@ -52,4 +65,18 @@ def update_or_create_token(db: Session, user_id: int, token_data: dict):
     
     db.commit()
     db.refresh(db_token)
-    return db_token 
\ No newline at end of file
+    return db_token 
+
+def get_favorites(db: Session):
+    return db.query(models.Favorite).order_by(models.Favorite.id).all()
+
+def create_favorite(db: Session, item_id: str, data: dict):
+    db_favorite = models.Favorite(item_id=item_id, data=data)
+    db.add(db_favorite)
+    db.commit()
+    return db_favorite
+
+def delete_favorite(db: Session, item_id: str) -> bool:
+    deleted = db.query(models.Favorite).filter(models.Favorite.item_id == item_id).delete()
+    db.commit()
+    return deleted > 0
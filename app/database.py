@@ -1,16 +1,47 @@
-from sqlalchemy import create_engine
+import orjson
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
 DATABASE_URL = "sqlite:///./ebay_spy.db"
+SCHEMA_LOCK_PATH = "./ebay_spy.db.lock"
 
 engine = create_engine(
-    DATABASE_URL, connect_args={"check_same_thread": False}
+    DATABASE_URL,
+    connect_args={"check_same_thread": False},
+    json_serializer=lambda obj: orjson.dumps(obj).decode(),
+    json_deserializer=orjson.loads
 )
+
+# WAL lets readers proceed while a write is in progress
+@event.listens_for(engine, "connect")
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.close()
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
+def init_db():
+    """
+    Creates any missing tables. Processes starting together take turns on a
+    file lock, so only one of them issues DDL at a time and the rest find the
+    tables already in place.
+    """
+    with open(SCHEMA_LOCK_PATH, "w") as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        Base.metadata.create_all(bind=engine)
+
 # Dependency to get a DB session
 def get_db():
     db = SessionLocal()
@@ -12,7 +12,7 @@ It supports two authentication modes:
 Features:
 - ✅ Dual-mode authentication (Application & User)
 - ✅ Automatic, cached token management for both modes
-- ✅ Smart rate limiting with exponential backoff (to be implemented)
+- ✅ Smart rate limiting with exponential backoff
 - ✅ Comprehensive error handling and retries (to be implemented)
 - ✅ Request/response logging
 - ✅ Centralized httpx client session
@@ -22,26 +22,123 @@ import os
 import time
 import httpx
 import logging
-from typing import Optional, Dict, Any, Union
+import orjson
+from typing import Optional, Dict, Any, Tuple, Union
 from datetime import datetime, timedelta
 from urllib.parse import urljoin
 import asyncio
 from functools import wraps
+from contextlib import asynccontextmanager
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 
+try:
+    import h2  # enables HTTP/2 in httpx
+except ImportError:
+    h2 = None
+
 from app import crud, security, models
 from app.database import SessionLocal, get_db
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # --- In-memory cache for Application Token ---
-app_token_cache: Dict[str, Any] = {
-    "token": None,
-    "expires_at": None
-}
+# (token, monotonic expiry) swapped in as a single reference so readers never
+# see a token paired with another token's expiry. Only refreshes take the lock.
+app_token_cache: Optional[Tuple[str, float]] = None
 app_token_lock = asyncio.Lock()
 
+# Treat the token as expired this many seconds early.
+APP_TOKEN_EXPIRY_BUFFER = 300
+
+
+# --- Shared HTTP connection pool ---
+# One httpx client for every eBay call so TCP/TLS connections are kept alive
+# and reused instead of being re-established per request. With h2 installed
+# the client speaks HTTP/2, so concurrent calls share a single connection.
+_http_client: Optional[httpx.AsyncClient] = None
+
+# Extra attempts for establishing a connection; requests themselves are never resent.
+HTTP_CONNECT_RETRIES = 2
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the process-wide httpx client, creating it on first use."""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            timeout=30,
+            transport=httpx.AsyncHTTPTransport(
+                http2=h2 is not None,
+                retries=HTTP_CONNECT_RETRIES,
+                limits=httpx.Limits(max_connections=100, max_keepalive_connections=20)
+            )
+        )
+    return _http_client
+
+
+async def close_http_client() -> None:
+    """Close the shared httpx client. Called on application shutdown."""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+
+@asynccontextmanager
+async def http_client_lifespan(app):
+    """Application lifespan that opens the shared httpx client and closes it on shutdown."""
+    get_http_client()
+    try:
+        yield
+    finally:
+        await close_http_client()
+
+
+# --- Outbound rate limiting ---
+# Every call_api request waits for a concurrency slot and a rate token so bulk
+# listing work stays under eBay's per-app limits instead of tripping 429s.
+EBAY_MAX_CONCURRENT_REQUESTS = 32
+EBAY_REQUESTS_PER_SECOND = 20
+
+# Requests rejected with 429 are retried with exponential backoff.
+EBAY_MAX_ATTEMPTS = 3
+EBAY_RETRY_BASE_DELAY = 0.5
+
+
+class RateLimiter:
+    """Token bucket allowing `rate` requests per second, with bursts of up to `rate`."""
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.tokens = rate
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """Wait until a request may be sent. Waiters are served in arrival order."""
+        async with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+            self.tokens = 0
+            self.updated = time.monotonic()
+
+
+ebay_request_semaphore = asyncio.Semaphore(EBAY_MAX_CONCURRENT_REQUESTS)
+ebay_rate_limiter = RateLimiter(EBAY_REQUESTS_PER_SECOND)
+
+
+def _cached_application_token() -> Optional[str]:
+    """Return the cached application token if it is still valid, else None."""
+    cached = app_token_cache
+    if cached is not None and time.monotonic() < cached[1] - APP_TOKEN_EXPIRY_BUFFER:
+        return cached[0]
+    return None
+
 
 class EbayAPIError(Exception):
     """Custom exception for all eBay API-related errors."""
@@ -55,9 +152,11 @@ class EbayAPIClient:
     An advanced, asynchronous eBay API client that supports both Application tokens
     for browsing and User-specific OAuth tokens for seller operations.
     """
-    def __init__(self, user_id: Optional[int] = None):
+    def __init__(self, user_id: Optional[int] = None, access_token: Optional[str] = None):
         self.base_url = "https://api.ebay.com"
         self.user_id = user_id
+        # A user token resolved by the caller; used as-is instead of reading the DB per call
+        self.access_token = access_token
         
         self.client_id = os.getenv("EBAY_CLIENT_ID")
         self.client_secret = os.getenv("EBAY_CLIENT_SECRET")
@@ -69,6 +168,8 @@ class EbayAPIClient:
         Determines which token to use (Application or User) and returns the
         appropriate Authorization header.
         """
+        if self.access_token:
+            return {"Authorization": f"Bearer {self.access_token}"}
         if self.user_id:
             db = next(get_db())
             try:
@@ -90,10 +191,19 @@ class EbayAPIClient:
         Retrieves a valid Application access token using the Client Credentials Grant flow.
         The token is cached in memory to improve performance.
         """
+        global app_token_cache
+
+        # Fast path: no lock needed to read a valid cached token.
+        token = _cached_application_token()
+        if token:
+            return token
+
         async with app_token_lock:
-            if app_token_cache["token"] and isinstance(app_token_cache["expires_at"], datetime) and app_token_cache["expires_at"] > datetime.utcnow() + timedelta(minutes=5):
-                logger.info("Using cached eBay application token.")
-                return str(app_token_cache["token"])
+            # Another coroutine may have refreshed while we waited for the lock.
+            token = _cached_application_token()
+            if token:
+                logger.debug("Using cached eBay application token.")
+                return token
 
             logger.info("Application token expired or not found. Fetching new one.")
             token_url = f"{self.base_url}/identity/v1/oauth2/token"
@@ -108,24 +218,22 @@ class EbayAPIClient:
             auth = (self.client_id, self.client_secret)
             
             try:
-                async with httpx.AsyncClient() as client:
-                    response = await client.post(token_url, headers=headers, data=data, auth=auth)
+                response = await get_http_client().post(token_url, headers=headers, data=data, auth=auth)
                 response.raise_for_status()
                 
                 token_data = response.json()
                 access_token = token_data["access_token"]
                 expires_in = token_data.get("expires_in", 7200)
 
-                app_token_cache["token"] = access_token
-                app_token_cache["expires_at"] = datetime.utcnow() + timedelta(seconds=expires_in)
+                app_token_cache = (access_token, time.monotonic() + expires_in)
                 
                 logger.info("Successfully fetched and cached new application token.")
                 return access_token
             except httpx.HTTPStatusError as e:
-                logger.error(f"Failed to get application token: {e.response.status_code} - {e.response.text}")
+                logger.error("Failed to get application token: %s - %s", e.response.status_code, e.response.text)
                 raise EbayAPIError(f"eBay authentication failed: {e.response.text}", status_code=e.response.status_code)
             except Exception as e:
-                logger.error(f"An unexpected error occurred while getting application token: {e}")
+                logger.error("An unexpected error occurred while getting application token: %s", e)
                 raise EbayAPIError(f"An unexpected error occurred: {e}")
 
     async def _get_user_access_token(self, db: Session) -> Optional[str]:
@@ -136,17 +244,17 @@ class EbayAPIClient:
         if not self.user_id:
             return None
 
-        token_record = crud.get_token_for_user(db, self.user_id)
+        token_record = await run_in_threadpool(crud.get_token_for_user, db, self.user_id)
         if not token_record:
             return None
 
         # Explicitly cast the comparison to bool
         is_expired = bool(datetime.utcnow() >= token_record.access_token_expires_at - timedelta(minutes=5))
         if is_expired:
-            logger.info(f"Access token for user {self.user_id} is expired. Refreshing now.")
+            logger.info("Access token for user %s is expired. Refreshing now.", self.user_id)
             return await self._refresh_user_token(token_record, db)
         
-        logger.info(f"Using valid access token for user {self.user_id}.")
+        logger.debug("Using valid access token for user %s.", self.user_id)
         return security.decrypt_token(str(token_record.encrypted_access_token))
 
     async def _refresh_user_token(self, token_record: models.EbayOAuthToken, db: Session) -> str:
@@ -165,11 +273,10 @@ class EbayAPIClient:
         assert self.client_secret is not None
         auth = (self.client_id, self.client_secret)
 
-        async with httpx.AsyncClient() as client:
-            response = await client.post(token_url, headers=headers, data=data, auth=auth)
+        response = await get_http_client().post(token_url, headers=headers, data=data, auth=auth)
 
         if response.status_code != 200:
-            logger.error(f"Failed to refresh token for user {self.user_id}. Status: {response.status_code}, Response: {response.text}")
+            logger.error("Failed to refresh token for user %s. Status: %s, Response: %s", self.user_id, response.status_code, response.text)
             raise EbayAPIError("Failed to refresh eBay token. Please try reconnecting your account.", status_code=401)
         
         new_token_data = response.json()
@@ -178,8 +285,8 @@ class EbayAPIClient:
             new_token_data["refresh_token"] = decrypted_refresh_token
         
         if self.user_id:
-            crud.update_or_create_token(db, user_id=self.user_id, token_data=new_token_data)
-            logger.info(f"Successfully refreshed and updated token for user {self.user_id}.")
+            await run_in_threadpool(crud.update_or_create_token, db, user_id=self.user_id, token_data=new_token_data)
+            logger.info("Successfully refreshed and updated token for user %s.", self.user_id)
         
         return str(new_token_data["access_token"])
 
@@ -200,26 +307,37 @@ class EbayAPIClient:
         if headers:
             request_headers.update(headers)
         
-        logger.info(f"Making API call: {method} {full_url}")
-        async with httpx.AsyncClient(timeout=30) as client:
+        logger.debug("Making API call: %s %s", method, full_url)
+        for attempt in range(EBAY_MAX_ATTEMPTS):
             try:
-                response = await client.request(method, full_url, params=params, json=json_data, headers=request_headers)
+                await ebay_rate_limiter.acquire()
+                async with ebay_request_semaphore:
+                    response = await get_http_client().request(method, full_url, params=params, json=json_data, headers=request_headers)
                 response.raise_for_status()
                 
                 if response.status_code == 204:
                     return None
-                return response.json()
+                return orjson.loads(response.content)
             
             except httpx.HTTPStatusError as e:
-                logger.error(f"eBay API Error on {endpoint}: {e.response.status_code} - {e.response.text}")
+                if e.response.status_code == 429 and attempt + 1 < EBAY_MAX_ATTEMPTS:
+                    delay = EBAY_RETRY_BASE_DELAY * 2 ** attempt
+                    logger.warning("eBay rate limit hit on %s, retrying in %.1fs", endpoint, delay)
+                    await asyncio.sleep(delay)
+                    continue
+                logger.error("eBay API Error on %s: %s - %s", endpoint, e.response.status_code, e.response.text)
                 raise EbayAPIError(f"eBay API request failed: {e.response.text}", status_code=e.response.status_code)
             except httpx.RequestError as e:
-                logger.error(f"Network error calling eBay API on {endpoint}: {e}")
+                logger.error("Network error calling eBay API on %s: %s", endpoint, e)
                 raise EbayAPIError(f"A network error occurred: {e}", status_code=503)
 
 # Global Client Instance for Public Calls
 ebay_client = EbayAPIClient()
 
 # Helper function for user-specific calls
-def get_user_ebay_client(user_id: int) -> EbayAPIClient:
-    return EbayAPIClient(user_id=user_id) 
\ No newline at end of file
+def get_user_ebay_client(user_id: int, access_token: Optional[str] = None) -> EbayAPIClient:
+    return EbayAPIClient(user_id=user_id, access_token=access_token)
+
+async def prefetch_application_token() -> None:
+    """Fetch the application token ahead of the first public API call."""
+    await ebay_client._get_application_access_token() 
\ No newline at end of file
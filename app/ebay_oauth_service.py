@@ -15,14 +15,18 @@ Key Features:
 """
 
 import os
+import time
 import httpx
 import logging
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
 from datetime import datetime, timedelta
 from urllib.parse import urlencode
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 
 from . import crud, security, models
+from .ebay_api_client import get_http_client
+from .keyed_locks import KeyedLocks
 
 logger = logging.getLogger(__name__)
 
@@ -59,8 +63,35 @@ class EbayOAuthService:
         
         self._validate_credentials()
         
+        # Everything in the authorization URL except the optional state is fixed,
+        # so the query string is encoded once
+        params = {
+            "client_id": self.client_id,
+            "response_type": "code",
+            "redirect_uri": self.redirect_uri,  # This should be your RuName
+            "scope": " ".join(self.scopes),
+            "prompt": "login",  # Force login screen
+            "response_mode": "query"  # Ensure response comes as query parameters
+        }
+        self._authorization_url_base = f"{self.auth_url}?{urlencode(params)}"
+        
+        # Token endpoint headers never change, so the Basic credentials are encoded once
+        self._token_headers = {
+            "Content-Type": "application/x-www-form-urlencoded",
+            "Authorization": f"Basic {self._get_basic_auth()}"
+        }
+        
+        # Decrypted access tokens keyed by user ID: (token, monotonic expiry)
+        self._user_token_cache: Dict[int, Tuple[str, float]] = {}
+        
+        # Recent authorization code exchanges: code -> (token data, monotonic expiry).
+        # eBay codes are single use, so a retried callback must reuse the first result.
+        self._code_cache: Dict[str, Tuple[Dict[str, Any], float]] = {}
+        self._code_locks = KeyedLocks()
+        self.code_cache_ttl = 30
+        
         # Log the cleaned RuName for verification
-        logger.info(f"Initialized eBay OAuth service with RuName: {self.redirect_uri}")
+        logger.info("Initialized eBay OAuth service with RuName: %s", self.redirect_uri)
     
     def _validate_credentials(self):
         """Validate that all required credentials are present and properly formatted."""
@@ -104,24 +135,14 @@ class EbayOAuthService:
         Returns:
             Complete eBay OAuth authorization URL
         """
-        # eBay OAuth 2.0 authorization parameters
-        params = {
-            "client_id": self.client_id,
-            "response_type": "code",
-            "redirect_uri": self.redirect_uri,  # This should be your RuName
-            "scope": " ".join(self.scopes),
-            "prompt": "login",  # Force login screen
-            "response_mode": "query"  # Ensure response comes as query parameters
-        }
-        
+        url = self._authorization_url_base
         if state:
-            params["state"] = state
-            
-        url = f"{self.auth_url}?{urlencode(params)}"
+            url = f"{url}&{urlencode({'state': state})}"
         
-        logger.info(f"Generated eBay OAuth URL with {len(self.scopes)} scopes")
-        logger.info(f"Redirect URI (RuName): {self.redirect_uri}")
-        logger.info(f"Full authorization URL: {url}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Generated eBay OAuth URL with %d scopes", len(self.scopes))
+            logger.debug("Redirect URI (RuName): %s", self.redirect_uri)
+            logger.debug("Full authorization URL: %s", url)
         
         return url
     
@@ -135,11 +156,31 @@ class EbayOAuthService:
         Returns:
             Dictionary containing token information
         """
-        headers = {
-            "Content-Type": "application/x-www-form-urlencoded",
-            "Authorization": f"Basic {self._get_basic_auth()}"
-        }
+        cached = self._get_cached_code_exchange(authorization_code)
+        if cached:
+            return cached
+        
+        # Serialize concurrent callbacks for the same code so only one reaches eBay
+        async with self._code_locks.hold(authorization_code):
+            cached = self._get_cached_code_exchange(authorization_code)
+            if cached:
+                return cached
+            
+            token_data = await self._request_code_exchange(authorization_code)
+            self._code_cache[authorization_code] = (token_data, time.monotonic() + self.code_cache_ttl)
+            return token_data
+    
+    def _get_cached_code_exchange(self, authorization_code: str) -> Optional[Dict[str, Any]]:
+        """Return a recent exchange result for this code, evicting expired entries."""
+        now = time.monotonic()
+        for code in [c for c, (_, expires_at) in self._code_cache.items() if expires_at <= now]:
+            del self._code_cache[code]
         
+        cached = self._code_cache.get(authorization_code)
+        return cached[0] if cached else None
+    
+    async def _request_code_exchange(self, authorization_code: str) -> Dict[str, Any]:
+        """Perform the authorization code grant request against eBay."""
         data = {
             "grant_type": "authorization_code",
             "code": authorization_code,
@@ -147,11 +188,10 @@ class EbayOAuthService:
         }
         
         try:
-            async with httpx.AsyncClient(timeout=30) as client:
-                response = await client.post(self.token_url, headers=headers, data=data)
+            response = await get_http_client().post(self.token_url, headers=self._token_headers, data=data)
             
             if response.status_code != 200:
-                logger.error(f"eBay token exchange failed: {response.status_code} - {response.text}")
+                logger.error("eBay token exchange failed: %s - %s", response.status_code, response.text)
                 raise Exception(f"Failed to exchange authorization code: {response.text}")
             
             token_data = response.json()
@@ -160,10 +200,10 @@ class EbayOAuthService:
             return token_data
             
         except httpx.RequestError as e:
-            logger.error(f"Request error during token exchange: {str(e)}")
+            logger.error("Request error during token exchange: %s", e)
             raise Exception(f"Network error during token exchange: {str(e)}")
         except Exception as e:
-            logger.error(f"Unexpected error during token exchange: {str(e)}")
+            logger.error("Unexpected error during token exchange: %s", e)
             raise
     
     async def refresh_access_token(self, refresh_token: str) -> Dict[str, Any]:
@@ -176,11 +216,6 @@ class EbayOAuthService:
         Returns:
             New token data dictionary
         """
-        headers = {
-            "Content-Type": "application/x-www-form-urlencoded",
-            "Authorization": f"Basic {self._get_basic_auth()}"
-        }
-        
         data = {
             "grant_type": "refresh_token",
             "refresh_token": refresh_token,
@@ -188,11 +223,10 @@ class EbayOAuthService:
         }
         
         try:
-            async with httpx.AsyncClient(timeout=30) as client:
-                response = await client.post(self.token_url, headers=headers, data=data)
+            response = await get_http_client().post(self.token_url, headers=self._token_headers, data=data)
             
             if response.status_code != 200:
-                logger.error(f"eBay token refresh failed: {response.status_code} - {response.text}")
+                logger.error("eBay token refresh failed: %s - %s", response.status_code, response.text)
                 raise Exception(f"Failed to refresh access token: {response.text}")
             
             token_data = response.json()
@@ -205,10 +239,10 @@ class EbayOAuthService:
             return token_data
             
         except httpx.RequestError as e:
-            logger.error(f"Request error during token refresh: {str(e)}")
+            logger.error("Request error during token refresh: %s", e)
             raise Exception(f"Network error during token refresh: {str(e)}")
         except Exception as e:
-            logger.error(f"Unexpected error during token refresh: {str(e)}")
+            logger.error("Unexpected error during token refresh: %s", e)
             raise
     
     def store_user_tokens(self, db: Session, user_id: int, token_data: Dict[str, Any]) -> None:
@@ -222,9 +256,10 @@ class EbayOAuthService:
         """
         try:
             crud.update_or_create_token(db, user_id=user_id, token_data=token_data)
-            logger.info(f"Stored encrypted eBay tokens for user {user_id}")
+            self._cache_access_token(user_id, token_data["access_token"], token_data.get("expires_in", 7200))
+            logger.debug("Stored encrypted eBay tokens for user %s", user_id)
         except Exception as e:
-            logger.error(f"Failed to store tokens for user {user_id}: {str(e)}")
+            logger.error("Failed to store tokens for user %s: %s", user_id, e)
             raise
     
     def get_stored_token(self, db: Session, user_id: int) -> Optional[models.EbayOAuthToken]:
@@ -260,7 +295,7 @@ class EbayOAuthService:
             encrypted_token = str(token_record.encrypted_access_token)
             return security.decrypt_token(encrypted_token)
         except Exception as e:
-            logger.error(f"Failed to decrypt access token for user {user_id}: {str(e)}")
+            logger.error("Failed to decrypt access token for user %s: %s", user_id, e)
             return None
     
     def is_token_expired(self, db: Session, user_id: int, buffer_minutes: int = 5) -> bool:
@@ -279,6 +314,10 @@ class EbayOAuthService:
         if not token_record:
             return True
             
+        return self._is_record_expired(token_record, buffer_minutes)
+    
+    def _is_record_expired(self, token_record: models.EbayOAuthToken, buffer_minutes: int = 5) -> bool:
+        """Check expiry of an already-loaded token record."""
         buffer_time = timedelta(minutes=buffer_minutes)
         # Convert SQLAlchemy DateTime to Python datetime
         expires_at = token_record.access_token_expires_at
@@ -299,14 +338,19 @@ class EbayOAuthService:
         Returns:
             Valid access token or None if user not authenticated
         """
-        token_record = self.get_stored_token(db, user_id)
+        cached_token = self._get_cached_access_token(user_id)
+        if cached_token:
+            return cached_token
+        
+        # Synchronous SQLAlchemy calls run in the threadpool to keep the event loop free
+        token_record = await run_in_threadpool(self.get_stored_token, db, user_id)
         if not token_record:
-            logger.warning(f"No eBay token found for user {user_id}")
+            logger.warning("No eBay token found for user %s", user_id)
             return None
         
         # Check if token needs refresh
-        if self.is_token_expired(db, user_id):
-            logger.info(f"eBay token expired for user {user_id}, refreshing...")
+        if self._is_record_expired(token_record):
+            logger.info("eBay token expired for user %s, refreshing...", user_id)
             
             try:
                 # Get and decrypt refresh token
@@ -317,17 +361,25 @@ class EbayOAuthService:
                 new_token_data = await self.refresh_access_token(refresh_token)
                 
                 # Store the new tokens
-                self.store_user_tokens(db, user_id, new_token_data)
+                await run_in_threadpool(self.store_user_tokens, db, user_id, new_token_data)
                 
                 # Return the new access token
                 return new_token_data["access_token"]
                 
             except Exception as e:
-                logger.error(f"Failed to refresh eBay token for user {user_id}: {str(e)}")
+                logger.error("Failed to refresh eBay token for user %s: %s", user_id, e)
                 return None
         
-        # Token is still valid, return it
-        return self.get_decrypted_access_token(db, user_id)
+        # Token is still valid, decrypt it and keep it for subsequent calls
+        try:
+            access_token = security.decrypt_token(str(token_record.encrypted_access_token))
+        except Exception as e:
+            logger.error("Failed to decrypt access token for user %s: %s", user_id, e)
+            return None
+        
+        expires_in = (token_record.access_token_expires_at - datetime.utcnow()).total_seconds()
+        self._cache_access_token(user_id, access_token, expires_in)
+        return access_token
     
     def is_user_connected(self, db: Session, user_id: int) -> bool:
         """
@@ -352,16 +404,29 @@ class EbayOAuthService:
             user_id: User ID
         """
         try:
+            self._user_token_cache.pop(user_id, None)
+            
             # Delete the user's token record
             token_record = self.get_stored_token(db, user_id)
             if token_record:
                 db.delete(token_record)
                 db.commit()
-                logger.info(f"Disconnected eBay account for user {user_id}")
+                logger.info("Disconnected eBay account for user %s", user_id)
         except Exception as e:
-            logger.error(f"Failed to disconnect user {user_id}: {str(e)}")
+            logger.error("Failed to disconnect user %s: %s", user_id, e)
             raise
     
+    def _cache_access_token(self, user_id: int, access_token: str, expires_in: float) -> None:
+        """Remember a decrypted access token until it is due for refresh."""
+        self._user_token_cache[user_id] = (access_token, time.monotonic() + expires_in)
+    
+    def _get_cached_access_token(self, user_id: int, buffer_minutes: int = 5) -> Optional[str]:
+        """Return the cached access token if it is not expired or about to expire."""
+        cached = self._user_token_cache.get(user_id)
+        if cached and time.monotonic() < cached[1] - buffer_minutes * 60:
+            return cached[0]
+        return None
+    
     def _get_basic_auth(self) -> str:
         """Generate Basic Auth header value for eBay API requests."""
         import base64
@@ -1,61 +1,124 @@
-import json
+import asyncio
+import logging
+import orjson
 from fastapi import APIRouter, HTTPException
-from typing import List, Dict, Any
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.exc import IntegrityError
+from typing import List, Dict, Any, Optional
 import os
 
+from app import crud
+from app.database import SessionLocal
+from app.http_cache import OrjsonResponse
+
+logger = logging.getLogger(__name__)
+
 router = APIRouter(prefix="/api", tags=["favorites"])
 
+# Favorites used to live in this JSON file; it is imported into the
+# database the first time the favorites table is found empty.
 FAVORITES_FILE = "favorites.json"
 
+# In-memory copy of the favorites table keyed by item_id, loaded on first use.
+# Dicts keep insertion order, so this doubles as the ordered favorites list.
+# Reads are served from memory; mutations are written through row by row.
+_FAVORITES: Optional[Dict[str, Dict[str, Any]]] = None
+_LOCK = asyncio.Lock()
+
 def read_favorites() -> List[Dict[str, Any]]:
-    """Reads the favorites from the JSON file."""
+    """Reads the favorites from the legacy JSON file."""
     if not os.path.exists(FAVORITES_FILE):
         return []
     try:
-        with open(FAVORITES_FILE, "r") as f:
-            return json.load(f)
-    except (json.JSONDecodeError, IOError):
+        with open(FAVORITES_FILE, "rb") as f:
+            return orjson.loads(f.read())
+    except (orjson.JSONDecodeError, IOError):
         return []
 
-def write_favorites(favorites: List[Dict[str, Any]]):
-    """Writes the favorites to the JSON file."""
+def load_favorites() -> Dict[str, Dict[str, Any]]:
+    """Loads all favorites from the database, importing the legacy JSON file if needed."""
+    db = SessionLocal()
     try:
-        with open(FAVORITES_FILE, "w") as f:
-            json.dump(favorites, f, indent=4)
-    except IOError:
-        raise HTTPException(status_code=500, detail="Could not write to favorites file.")
+        favorites = {fav.item_id: fav.data for fav in crud.get_favorites(db)}
+        if not favorites:
+            for fav in read_favorites():
+                item_id = fav.get("item_id")
+                if item_id:
+                    item_id = str(item_id)
+                if item_id and item_id not in favorites:
+                    crud.create_favorite(db, item_id=item_id, data=fav)
+                    favorites[item_id] = fav
+            if favorites:
+                logger.info("Imported %d favorites from %s", len(favorites), FAVORITES_FILE)
+        return favorites
+    finally:
+        db.close()
+
+def insert_favorite(item_id: str, item: Dict[str, Any]):
+    """Inserts a single favorite row."""
+    db = SessionLocal()
+    try:
+        crud.create_favorite(db, item_id=item_id, data=item)
+    finally:
+        db.close()
+
+def delete_favorite(item_id: str) -> bool:
+    """Deletes a single favorite row, returning whether it existed."""
+    db = SessionLocal()
+    try:
+        return crud.delete_favorite(db, item_id=item_id)
+    finally:
+        db.close()
+
+async def _ensure_loaded():
+    """Loads the favorites into memory the first time they are needed."""
+    global _FAVORITES
+    if _FAVORITES is not None:
+        return
+    async with _LOCK:
+        if _FAVORITES is None:
+            _FAVORITES = await run_in_threadpool(load_favorites)
+
+async def preload_favorites():
+    """Loads the favorites at startup so the first request does not wait on the database."""
+    await _ensure_loaded()
 
 @router.get("/favorites", response_model=List[Dict[str, Any]])
 async def get_favorites():
     """Retrieve all favorite items."""
-    return read_favorites()
+    await _ensure_loaded()
+    return OrjsonResponse(list(_FAVORITES.values()))
 
 @router.post("/favorites", status_code=201)
 async def add_favorite(item: Dict[str, Any]):
     """Add an item to favorites."""
-    favorites = read_favorites()
     item_id = item.get("item_id")
 
     if not item_id:
         raise HTTPException(status_code=400, detail="Item must have an 'item_id'.")
+    # The column is TEXT and DELETE receives the ID as a path string, so key
+    # the cache by the string form too (a JSON body may send a number)
+    item_id = str(item_id)
 
-    if any(fav["item_id"] == item_id for fav in favorites):
-        raise HTTPException(status_code=409, detail="Item already in favorites.")
+    await _ensure_loaded()
+    async with _LOCK:
+        if item_id in _FAVORITES:
+            raise HTTPException(status_code=409, detail="Item already in favorites.")
 
-    favorites.append(item)
-    write_favorites(favorites)
+        try:
+            await run_in_threadpool(insert_favorite, item_id, item)
+        except IntegrityError:
+            # Added by another worker process since our copy was loaded
+            raise HTTPException(status_code=409, detail="Item already in favorites.")
+        _FAVORITES[item_id] = item
     return {"message": "Item added to favorites."}
 
 @router.delete("/favorites/{item_id}", status_code=200)
 async def remove_favorite(item_id: str):
     """Remove an item from favorites by its ID."""
-    favorites = read_favorites()
-    
-    original_count = len(favorites)
-    favorites = [fav for fav in favorites if fav.get("item_id") != item_id]
-
-    if len(favorites) == original_count:
-        raise HTTPException(status_code=404, detail="Item not found in favorites.")
-
-    write_favorites(favorites)
-    return {"message": "Item removed from favorites."} 
\ No newline at end of file
+    await _ensure_loaded()
+    async with _LOCK:
+        deleted = await run_in_threadpool(delete_favorite, item_id)
+        if _FAVORITES.pop(item_id, None) is None and not deleted:
+            raise HTTPException(status_code=404, detail="Item not found in favorites.")
+    return {"message": "Item removed from favorites."}
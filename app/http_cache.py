@@ -0,0 +1,63 @@
+"""
+HTTP caching helpers for static responses
+"""
+
+import hashlib
+from typing import Any, Dict, Optional
+
+import orjson
+from fastapi import Request
+from fastapi.responses import JSONResponse, Response
+
+# Static JSON only changes with a deploy, so let browsers and proxies keep it for a day
+STATIC_JSON_CACHE_CONTROL = "public, max-age=86400"
+
+class OrjsonResponse(JSONResponse):
+    """JSONResponse rendered with orjson, which is faster than the stdlib encoder."""
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag."""
+    if if_none_match is None:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque_tag = etag.removeprefix("W/")
+    return opaque_tag in (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+
+def parse_accept_encoding(accept_encoding: Optional[str]) -> Dict[str, float]:
+    """Map each content-coding in an Accept-Encoding header to its q-value."""
+    codings: Dict[str, float] = {}
+    for part in (accept_encoding or "").split(","):
+        coding, *params = [piece.strip() for piece in part.split(";")]
+        if not coding:
+            continue
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        codings[coding.lower()] = q
+    return codings
+
+def accepts_encoding(accept_encoding: Optional[str], coding: str) -> bool:
+    """True if the header allows coding, explicitly or through "*", with a non-zero q."""
+    codings = parse_accept_encoding(accept_encoding)
+    q = codings.get(coding, codings.get("*", 0.0))
+    return q > 0
+
+class StaticJSONResponse:
+    """A JSON payload encoded once, served with an ETag and answered with 304 when unchanged."""
+    def __init__(self, payload: Any, cache_control: str = STATIC_JSON_CACHE_CONTROL):
+        self.body = orjson.dumps(payload)
+        self.etag = f'W/"{hashlib.md5(self.body).hexdigest()}"'
+        self.headers = {"ETag": self.etag, "Cache-Control": cache_control}
+
+    def respond(self, request: Request) -> Response:
+        if etag_matches(request.headers.get("if-none-match"), self.etag):
+            return Response(status_code=304, headers=self.headers)
+        return Response(content=self.body, media_type="application/json", headers=self.headers)
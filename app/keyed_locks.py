@@ -0,0 +1,35 @@
+"""
+Per-key asyncio locks
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Dict, Hashable, List
+
+class KeyedLocks:
+    """
+    One asyncio.Lock per key, created on first use and dropped once no
+    coroutine holds or waits on it. Entries are reference counted rather than
+    checked with lock.locked(), which is already False while a released lock
+    still has queued waiters.
+    """
+    def __init__(self):
+        # key -> [lock, number of coroutines holding or waiting on it]
+        self._locks: Dict[Hashable, List] = {}
+
+    @asynccontextmanager
+    async def hold(self, key: Hashable):
+        entry = self._locks.get(key)
+        if entry is None:
+            entry = self._locks[key] = [asyncio.Lock(), 0]
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self._locks[key]
+
+    def __len__(self) -> int:
+        return len(self._locks)
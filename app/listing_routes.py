@@ -1,11 +1,8 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel, Field
 from typing import List
 
-from app import crud
-from app.database import get_db
-from app.ebay_api_client import EbayAPIClient
+from app.ebay_api_client import ebay_client
 
 router = APIRouter(prefix="/api/seller", tags=["seller"])
 
@@ -22,11 +19,11 @@ class ListingRequest(BaseModel):
     return_policy_id: str = Field(..., description="The ID of the return policy.")
 
 @router.post("/listing")
-async def create_listing(listing: ListingRequest, db: Session = Depends(get_db)):
+async def create_listing(listing: ListingRequest):
     """Creates an inventory item and publishes it as a new listing on eBay."""
     user_id = 1  # Hardcoded for the default user
 
-    client = EbayAPIClient()
+    client = ebay_client
     
     # 1. Create or update the inventory item
     inventory_item_data = {
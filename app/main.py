@@ -1,49 +1,208 @@
 import uvicorn
-from fastapi import FastAPI, Depends, HTTPException, Query
-from fastapi.responses import FileResponse, HTMLResponse, RedirectResponse
+from fastapi import FastAPI, Depends, HTTPException, Query, Request
+from fastapi.responses import HTMLResponse, RedirectResponse, Response, StreamingResponse
+from starlette.background import BackgroundTask
+from fastapi.concurrency import run_in_threadpool
+from fastapi.middleware.gzip import GZipMiddleware
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import IdentityResponder
 from fastapi.staticfiles import StaticFiles
 from pathlib import Path
+import asyncio
+import gzip
+import hashlib
+import orjson
 import os
-from urllib.parse import urlencode
-import httpx
+from contextlib import AsyncExitStack, asynccontextmanager
+from email.utils import formatdate
+from urllib.parse import parse_qs, urlencode
 from sqlalchemy.orm import Session
 import logging
 from datetime import datetime, timedelta
+from dotenv import load_dotenv
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import minify_html
+except ImportError:
+    minify_html = None
+
+# Load .env before reading LOG_LEVEL; app.security loads it again on import
+load_dotenv()
+
+# Configure logging before the app modules are imported so their import-time
+# records are kept; set LOG_LEVEL=WARNING in production to skip INFO records
+LOG_LEVEL = (os.getenv("LOG_LEVEL") or "INFO").upper()
+LOG_LEVEL_VALID = isinstance(logging.getLevelName(LOG_LEVEL), int)
+logging.basicConfig(level=LOG_LEVEL if LOG_LEVEL_VALID else logging.INFO)
+if not LOG_LEVEL_VALID:
+    logging.getLogger(__name__).warning("Unknown LOG_LEVEL %r, using INFO", LOG_LEVEL)
 
 from app.search_routes import router as search_router
 from app.debug_routes import router as debug_router
-from app.favorites_routes import router as favorites_router
+from app.favorites_routes import router as favorites_router, preload_favorites
 from app.listing_routes import router as listing_router
 from app.routes.scrape_routes import router as scrape_router
-from app.routes.ebay_listing_routes import router as ebay_listing_router
-from .database import engine, Base, get_db
+from app.routes.ebay_listing_routes import router as ebay_listing_router, clear_policy_cache
+from .database import get_db, init_db
+from .http_cache import OrjsonResponse, accepts_encoding, etag_matches
 from . import crud, models, security
 from .ebay_oauth_service import ebay_oauth
+from .ebay_api_client import get_user_ebay_client, get_http_client, http_client_lifespan, prefetch_application_token
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+# OAuth settings read once; the environment does not change while the process runs
+OAUTH_ENV = {
+    name: os.getenv(name)
+    for name in ("EBAY_CLIENT_ID", "EBAY_CLIENT_SECRET", "EBAY_REDIRECT_URI", "ENCRYPTION_KEY")
+}
+OAUTH_ENV_CHECK = {
+    "client_id": "SET" if OAUTH_ENV["EBAY_CLIENT_ID"] else "NOT_SET",
+    "client_secret": "SET" if OAUTH_ENV["EBAY_CLIENT_SECRET"] else "NOT_SET",
+    "redirect_uri": "SET" if OAUTH_ENV["EBAY_REDIRECT_URI"] else "NOT_SET",
+    "encryption_key": "SET" if OAUTH_ENV["ENCRYPTION_KEY"] else "NOT_SET"
+}
+
 
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
 STATIC_DIR = PROJECT_ROOT / "static"
+INDEX_PATH = STATIC_DIR / "index.html"
+CSS_PATH = STATIC_DIR / "app.css"
+
+# The stylesheet is linked with a content hash in its query string, so
+# browsers can cache it indefinitely and still pick up a changed file.
+CSS_VERSION = hashlib.md5(CSS_PATH.read_bytes()).hexdigest()[:12] if CSS_PATH.is_file() else None
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# The single-page frontend never changes while the process runs, so read and
+# compress it once instead of going back to disk on every page load.
+INDEX_HTML = INDEX_PATH.read_bytes() if INDEX_PATH.is_file() else None
+if INDEX_HTML and CSS_VERSION:
+    INDEX_HTML = INDEX_HTML.replace(
+        b'href="/static/app.css"', f'href="/static/app.css?v={CSS_VERSION}"'.encode()
+    )
+if INDEX_HTML and minify_html:
+    # Strip whitespace and comments from the markup and its inline script once;
+    # the compressed copies below are built from the smaller result.
+    INDEX_HTML = minify_html.minify(
+        INDEX_HTML.decode("utf-8"), minify_css=True, minify_js=True, keep_closing_tags=True
+    ).encode("utf-8")
+INDEX_HTML_GZIP = gzip.compress(INDEX_HTML, compresslevel=9) if INDEX_HTML else None
+INDEX_HTML_BR = brotli.compress(INDEX_HTML, quality=11) if brotli and INDEX_HTML else None
+INDEX_HASH = hashlib.md5(INDEX_HTML).hexdigest() if INDEX_HTML else None
+# The served page embeds the stylesheet's fingerprint, so it changes whenever
+# either file does
+INDEX_LAST_MODIFIED = formatdate(
+    max(path.stat().st_mtime for path in (INDEX_PATH, CSS_PATH) if path.is_file()), usegmt=True
+) if INDEX_HTML else None
+# The page URL never changes, so it is not marked immutable; browsers may show
+# a cached copy for a day while revalidating it against the ETag in the background.
+INDEX_CACHE_CONTROL = "public, max-age=3600, stale-while-revalidate=86400"
+INDEX_MEDIA_TYPE = "text/html; charset=utf-8"
+
+# Response headers for each variant, built once. Response objects themselves
+# are not shared between requests because middleware may rewrite their headers.
+# Each encoding is a different representation, so each gets its own strong ETag.
+INDEX_COMMON_HEADERS = {
+    "Last-Modified": INDEX_LAST_MODIFIED,
+    "Cache-Control": INDEX_CACHE_CONTROL,
+    "Vary": "Accept-Encoding",
+}
+INDEX_HEADERS = {**INDEX_COMMON_HEADERS, "ETag": f'"{INDEX_HASH}"'}
+INDEX_GZIP_HEADERS = {**INDEX_COMMON_HEADERS, "ETag": f'"{INDEX_HASH}-gzip"', "Content-Encoding": "gzip"}
+INDEX_BR_HEADERS = {**INDEX_COMMON_HEADERS, "ETag": f'"{INDEX_HASH}-br"', "Content-Encoding": "br"}
+
+# Unversioned static files may change between deploys, so browsers keep them
+# briefly and then revalidate with the ETag/Last-Modified StaticFiles sends.
+STATIC_CACHE_CONTROL = "public, max-age=3600, must-revalidate"
+
+class VersionedStaticFiles(StaticFiles):
+    """StaticFiles with caching headers; fingerprinted (``?v=...``) requests are immutable."""
+
+    async def get_response(self, path: str, scope):
+        response = await super().get_response(path, scope)
+        if response.status_code in (200, 304):
+            versioned = "v" in parse_qs(scope.get("query_string", b"").decode("latin-1"))
+            response.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL if versioned else STATIC_CACHE_CONTROL
+        return response
+
+class NegotiatedGZipMiddleware(GZipMiddleware):
+    """GZipMiddleware that honours q-values, so "gzip;q=0" is sent uncompressed."""
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and not accepts_encoding(Headers(scope=scope).get("accept-encoding"), "gzip"):
+            responder = IdentityResponder(self.app, self.minimum_size, exclude_content_types=self.exclude_content_types)
+            await responder(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+# Upper bound on how long a warmup step may hold up startup
+STARTUP_TASK_TIMEOUT = 10
+
+@asynccontextmanager
+async def schema_lifespan(app: FastAPI):
+    # Tables must exist before the warmup steps read from them
+    await run_in_threadpool(init_db)
+    yield
+
+@asynccontextmanager
+async def warmup_lifespan(app: FastAPI):
+    # Run the independent warmup steps side by side so startup takes as long
+    # as the slowest one, not their sum.
+    startup_tasks = {
+        "favorites preload": preload_favorites(),
+        "eBay application token prefetch": asyncio.wait_for(prefetch_application_token(), STARTUP_TASK_TIMEOUT),
+    }
+    results = await asyncio.gather(*startup_tasks.values(), return_exceptions=True)
+    for name, result in zip(startup_tasks, results):
+        if isinstance(result, BaseException):
+            # Warmup is best effort; requests retry the same work on demand
+            logger.warning("Startup step '%s' failed: %r", name, result)
+    yield
+
+def merge_lifespans(*lifespans):
+    """
+    Combine several lifespan context managers into one.
+    They start in the given order and shut down in reverse, and the ones
+    already started are still shut down if a later one fails to start.
+    """
+    @asynccontextmanager
+    async def merged(app: FastAPI):
+        async with AsyncExitStack() as stack:
+            for lifespan in lifespans:
+                await stack.enter_async_context(lifespan(app))
+            yield
+    return merged
 
 app = FastAPI(
     title="eBay Dropshipping Spy & Seller Tool",
     description="A powerful tool for eBay product research, analysis, and seller management.",
-    version="2.0.0"
+    version="2.0.0",
+    lifespan=merge_lifespans(schema_lifespan, http_client_lifespan, warmup_lifespan),
+    default_response_class=OrjsonResponse
 )
 
+# Compress larger JSON payloads such as search results. Small bodies are left
+# alone, and the index page is already sent pre-compressed.
+app.add_middleware(NegotiatedGZipMiddleware, minimum_size=1000, compresslevel=5)
+
 STATIC_DIR.mkdir(exist_ok=True)
-app.mount("/static", StaticFiles(directory=STATIC_DIR), name="static")
-app.include_router(search_router)
-app.include_router(debug_router)
-app.include_router(favorites_router)
-app.include_router(listing_router)
-app.include_router(scrape_router)
-app.include_router(ebay_listing_router)
+app.mount("/static", VersionedStaticFiles(directory=STATIC_DIR), name="static")
+ROUTERS = (
+    search_router,
+    debug_router,
+    favorites_router,
+    listing_router,
+    scrape_router,
+    ebay_listing_router,
+)
+for router in ROUTERS:
+    app.include_router(router)
 
 # --- eBay OAuth Routes ---
 
@@ -54,26 +213,18 @@ async def debug_oauth_url():
     This helps diagnose parameter issues with eBay OAuth.
     """
     try:
-        # Check environment variables
-        client_id = os.getenv("EBAY_CLIENT_ID")
-        client_secret = os.getenv("EBAY_CLIENT_SECRET")
-        redirect_uri = os.getenv("EBAY_REDIRECT_URI")
-        encryption_key = os.getenv("ENCRYPTION_KEY")
+        client_id = OAUTH_ENV["EBAY_CLIENT_ID"]
+        redirect_uri = OAUTH_ENV["EBAY_REDIRECT_URI"]
 
-        logger.info(f"Debug OAuth URL - Client ID: {client_id[:10] if client_id else 'None'}...")
-        logger.info(f"Debug OAuth URL - Redirect URI: {redirect_uri}")
+        logger.info("Debug OAuth URL - Client ID: %.10s...", client_id)
+        logger.info("Debug OAuth URL - Redirect URI: %s", redirect_uri)
 
         # Generate the auth URL
         auth_url = ebay_oauth.get_authorization_url()
 
         return {
             "status": "success",
-            "environment_check": {
-                "client_id": "SET" if client_id else "NOT_SET",
-                "client_secret": "SET" if client_secret else "NOT_SET",
-                "redirect_uri": "SET" if redirect_uri else "NOT_SET",
-                "encryption_key": "SET" if encryption_key else "NOT_SET"
-            },
+            "environment_check": OAUTH_ENV_CHECK,
             "credentials_preview": {
                 "client_id": f"{client_id[:10]}..." if client_id else None,
                 "redirect_uri": redirect_uri
@@ -84,40 +235,26 @@ async def debug_oauth_url():
         }
 
     except Exception as e:
-        logger.error(f"Debug OAuth URL error: {str(e)}")
+        logger.error("Debug OAuth URL error: %s", e)
         return {
             "status": "error",
             "error": str(e),
-            "environment_check": {
-                "client_id": "SET" if os.getenv("EBAY_CLIENT_ID") else "NOT_SET",
-                "client_secret": "SET" if os.getenv("EBAY_CLIENT_SECRET") else "NOT_SET",
-                "redirect_uri": "SET" if os.getenv("EBAY_REDIRECT_URI") else "NOT_SET",
-                "encryption_key": "SET" if os.getenv("ENCRYPTION_KEY") else "NOT_SET"
-            }
+            "environment_check": OAUTH_ENV_CHECK
         }
 
+# No state parameter is sent, so the consent URL is the same for every request
+# and is built once. Each request still gets its own response object, since
+# FastAPI sets per-request state such as background tasks on it.
+CONNECT_EBAY_URL = ebay_oauth.get_authorization_url()
+
 @app.get("/connect/ebay", tags=["authentication"])
 async def connect_ebay():
     """
     Redirect users to eBay OAuth consent page to connect their account.
     This is the main entry point for eBay authentication.
     """
-    try:
-        auth_url = ebay_oauth.get_authorization_url()
-        logger.info(f"Redirecting user to eBay OAuth consent page: {auth_url[:100]}...")
-        return RedirectResponse(url=auth_url)
-    except ValueError as e:
-        logger.error(f"OAuth configuration error: {str(e)}")
-        raise HTTPException(
-            status_code=500,
-            detail=f"eBay OAuth not properly configured: {str(e)}"
-        )
-    except Exception as e:
-        logger.error(f"Unexpected error in connect_ebay: {str(e)}")
-        raise HTTPException(
-            status_code=500,
-            detail="Failed to initiate eBay connection"
-        )
+    logger.info("Redirecting user to eBay OAuth consent page: %.100s...", CONNECT_EBAY_URL)
+    return RedirectResponse(url=CONNECT_EBAY_URL)
 
 @app.get("/auth/ebay/login", tags=["authentication"])
 async def ebay_login():
@@ -145,34 +282,28 @@ async def auth_ebay_callback(
 
         # Create or get user (in production, get user from session/JWT)
         user_email = "default_seller@example.com"
-        db_user = crud.get_user_by_email(db, email=user_email)
-        if not db_user:
-            db_user = crud.create_user(db, email=user_email)
-            logger.info(f"Created new user: {user_email}")
-
-        if not db_user:
-            raise HTTPException(
-                status_code=500,
-                detail="Could not create or find user account"
-            )
+        # The database calls are blocking, so keep them off the event loop
+        user_id = await run_in_threadpool(crud.upsert_user_by_email, db, email=user_email)
 
         # Store encrypted tokens using the OAuth service
-        # Type assertion: db_user.id is an int value from database record, not Column
-        user_id: int = db_user.id  # type: ignore
-        ebay_oauth.store_user_tokens(db, user_id, token_data)
+        await run_in_threadpool(ebay_oauth.store_user_tokens, db, user_id, token_data)
+        # The connected account may differ from the last one, whose policies no longer apply
+        clear_policy_cache(user_id)
 
-        logger.info(f"Successfully connected eBay account for user: {user_email}")
+        logger.info("Successfully connected eBay account for user: %s", user_email)
         return RedirectResponse(url="/?auth_status=success")
 
     except Exception as e:
-        logger.error(f"OAuth callback error: {str(e)}")
+        logger.error("OAuth callback error: %s", e)
         raise HTTPException(
             status_code=400,
             detail=f"Failed to complete eBay authentication: {str(e)}"
         )
 
+# Handlers that only talk to the database are plain functions, which FastAPI
+# runs in its threadpool so the blocking queries do not stall the event loop.
 @app.get("/auth/ebay/status", tags=["authentication"])
-async def auth_status(db: Session = Depends(get_db)):
+def auth_status(db: Session = Depends(get_db)):
     """
     Check the authentication status of the user.
     Returns connection status and token validity information.
@@ -203,7 +334,7 @@ async def auth_status(db: Session = Depends(get_db)):
         }
 
     except Exception as e:
-        logger.error(f"Error checking auth status: {str(e)}")
+        logger.error("Error checking auth status: %s", e)
         raise HTTPException(
             status_code=500,
             detail="Failed to check authentication status"
@@ -234,14 +365,14 @@ async def get_valid_token(db: Session = Depends(get_db)):
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error getting valid token: {str(e)}")
+        logger.error("Error getting valid token: %s", e)
         raise HTTPException(
             status_code=500,
             detail="Failed to retrieve valid token"
         )
 
 @app.post("/auth/ebay/disconnect", tags=["authentication"])
-async def disconnect_ebay(db: Session = Depends(get_db)):
+def disconnect_ebay(db: Session = Depends(get_db)):
     """
     Disconnect the user's eBay account by removing stored tokens.
     """
@@ -249,6 +380,7 @@ async def disconnect_ebay(db: Session = Depends(get_db)):
         user_id = 1  # In production, get from session/JWT
 
         ebay_oauth.disconnect_user(db, user_id)
+        clear_policy_cache(user_id)
 
         return {
             "success": True,
@@ -256,7 +388,7 @@ async def disconnect_ebay(db: Session = Depends(get_db)):
         }
 
     except Exception as e:
-        logger.error(f"Error disconnecting eBay account: {str(e)}")
+        logger.error("Error disconnecting eBay account: %s", e)
         raise HTTPException(
             status_code=500,
             detail="Failed to disconnect eBay account"
@@ -264,13 +396,16 @@ async def disconnect_ebay(db: Session = Depends(get_db)):
 
 # --- Helper Functions for eBay API Usage ---
 
-async def get_authenticated_ebay_client(db: Session, user_id: int):
+EBAY_API_BASE_URL = "https://api.ebay.com"
+
+async def get_ebay_auth_headers(db: Session, user_id: int) -> dict:
     """
-    Get an authenticated eBay API client for making authorized requests.
+    Get the request headers for authorized eBay API calls on behalf of a user.
+    Requests go through the shared connection pool.
 
     Usage example:
-        async with get_authenticated_ebay_client(db, user_id) as client:
-            response = await client.get("/sell/inventory/v1/inventory_item")
+        headers = await get_ebay_auth_headers(db, user_id)
+        response = await get_http_client().get(f"{EBAY_API_BASE_URL}/sell/inventory/v1/inventory_item", headers=headers)
     """
     access_token = await ebay_oauth.get_valid_access_token(db, user_id)
     if not access_token:
@@ -279,16 +414,51 @@ async def get_authenticated_ebay_client(db: Session, user_id: int):
             detail="User not authenticated with eBay"
         )
 
-    headers = {
+    return {
         "Authorization": f"Bearer {access_token}",
         "Content-Type": "application/json",
         "Accept": "application/json"
     }
 
-    return httpx.AsyncClient(
-        base_url="https://api.ebay.com",
-        headers=headers,
-        timeout=30
+# eBay error pages can be large HTML documents; only this much is kept for the
+# error detail, the rest is dropped with the connection.
+EBAY_ERROR_DETAIL_LIMIT = 2048
+
+async def open_ebay_get(path: str, headers: dict):
+    """
+    Send an eBay GET and return the response with its body still unread.
+    Non-200 responses are raised as HTTPException after reading at most
+    EBAY_ERROR_DETAIL_LIMIT bytes of the body.
+    """
+    client = get_http_client()
+    upstream = await client.send(
+        client.build_request("GET", f"{EBAY_API_BASE_URL}{path}", headers=headers), stream=True
+    )
+    if upstream.status_code != 200:
+        detail = bytearray()
+        try:
+            async for chunk in upstream.aiter_bytes():
+                detail += chunk
+                if len(detail) >= EBAY_ERROR_DETAIL_LIMIT:
+                    break
+        finally:
+            await upstream.aclose()
+        raise HTTPException(
+            status_code=upstream.status_code,
+            detail=f"eBay API error: {detail[:EBAY_ERROR_DETAIL_LIMIT].decode(errors='replace')}"
+        )
+    return upstream
+
+async def stream_ebay_get(path: str, headers: dict) -> StreamingResponse:
+    """
+    Relay an eBay GET response to the client as it arrives, without buffering
+    or re-encoding the body.
+    """
+    upstream = await open_ebay_get(path, headers)
+    return StreamingResponse(
+        upstream.aiter_bytes(),
+        media_type="application/json",
+        background=BackgroundTask(upstream.aclose)
     )
 
 @app.get("/api/ebay/inventory", tags=["ebay-api"])
@@ -300,21 +470,13 @@ async def get_user_inventory(db: Session = Depends(get_db)):
     try:
         user_id = 1  # In production, get from session/JWT
 
-        async with await get_authenticated_ebay_client(db, user_id) as client:
-            response = await client.get("/sell/inventory/v1/inventory_item")
-
-            if response.status_code == 200:
-                return response.json()
-            else:
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail=f"eBay API error: {response.text}"
-                )
+        headers = await get_ebay_auth_headers(db, user_id)
+        return await stream_ebay_get("/sell/inventory/v1/inventory_item", headers)
 
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error fetching inventory: {str(e)}")
+        logger.error("Error fetching inventory: %s", e)
         raise HTTPException(
             status_code=500,
             detail="Failed to fetch inventory from eBay"
@@ -328,21 +490,13 @@ async def get_user_orders(db: Session = Depends(get_db)):
     try:
         user_id = 1  # In production, get from session/JWT
 
-        async with await get_authenticated_ebay_client(db, user_id) as client:
-            response = await client.get("/sell/fulfillment/v1/order")
-
-            if response.status_code == 200:
-                return response.json()
-            else:
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail=f"eBay API error: {response.text}"
-                )
+        headers = await get_ebay_auth_headers(db, user_id)
+        return await stream_ebay_get("/sell/fulfillment/v1/order", headers)
 
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error fetching orders: {str(e)}")
+        logger.error("Error fetching orders: %s", e)
         raise HTTPException(
             status_code=500,
             detail="Failed to fetch orders from eBay"
@@ -357,26 +511,24 @@ async def get_ebay_profile(db: Session = Depends(get_db)):
     try:
         user_id = 1  # In production, get from session/JWT
 
-        async with await get_authenticated_ebay_client(db, user_id) as client:
-            # Get user's account information
-            response = await client.get("/sell/account/v1/account")
+        headers = await get_ebay_auth_headers(db, user_id)
+        # Get user's account information
+        response = await open_ebay_get("/sell/account/v1/account", headers)
+        try:
+            data = orjson.loads(await response.aread())
+        finally:
+            await response.aclose()
 
-            if response.status_code == 200:
-                return {
-                    "status": "success",
-                    "data": response.json(),
-                    "message": "Successfully retrieved eBay profile"
-                }
-            else:
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail=f"eBay API error: {response.text}"
-                )
+        return {
+            "status": "success",
+            "data": data,
+            "message": "Successfully retrieved eBay profile"
+        }
 
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error fetching eBay profile: {str(e)}")
+        logger.error("Error fetching eBay profile: %s", e)
         raise HTTPException(
             status_code=500,
             detail="Failed to fetch eBay profile"
@@ -392,7 +544,7 @@ async def get_ebay_store_info(db: Session = Depends(get_db)):
         user_id = 1  # In production, get from session/JWT
         
         # Check if user is connected
-        if not ebay_oauth.is_user_connected(db, user_id):
+        if not await run_in_threadpool(ebay_oauth.is_user_connected, db, user_id):
             return {
                 "is_connected": False,
                 "store_info": None,
@@ -400,9 +552,9 @@ async def get_ebay_store_info(db: Session = Depends(get_db)):
                 "message": "eBay account not connected"
             }
 
-        # Get user's eBay client
-        from app.ebay_api_client import get_user_ebay_client
-        client = get_user_ebay_client(user_id)
+        # Get user's eBay client with the token resolved once for both calls
+        access_token = await ebay_oauth.get_valid_access_token(db, user_id)
+        client = get_user_ebay_client(user_id, access_token=access_token)
         
         store_info = {}
         user_profile = {}
@@ -418,7 +570,7 @@ async def get_ebay_store_info(db: Session = Depends(get_db)):
                     "status": account_response.get("status")
                 }
         except Exception as e:
-            logger.warning(f"Could not fetch account info: {str(e)}")
+            logger.warning("Could not fetch account info: %s", e)
         
         try:
             # Try to get store information (if user has an eBay store)
@@ -431,12 +583,12 @@ async def get_ebay_store_info(db: Session = Depends(get_db)):
                     "subscription_level": store_response.get("subscriptionLevel")
                 }
         except Exception as e:
-            logger.info(f"User may not have an eBay store: {str(e)}")
+            logger.info("User may not have an eBay store: %s", e)
             # This is normal - not all users have eBay stores
             store_info = None
         
         # Get token status
-        token_record = ebay_oauth.get_stored_token(db, user_id)
+        token_record = await run_in_threadpool(ebay_oauth.get_stored_token, db, user_id)
         token_expires_at = token_record.access_token_expires_at.isoformat() if token_record else None
         
         return {
@@ -448,14 +600,14 @@ async def get_ebay_store_info(db: Session = Depends(get_db)):
         }
 
     except Exception as e:
-        logger.error(f"Error fetching eBay store info: {str(e)}")
+        logger.error("Error fetching eBay store info: %s", e)
         raise HTTPException(
             status_code=500,
             detail="Failed to fetch eBay store information"
         )
 
 @app.post("/api/ebay/disconnect", tags=["ebay-api"])
-async def disconnect_ebay_account(db: Session = Depends(get_db)):
+def disconnect_ebay_account(db: Session = Depends(get_db)):
     """
     Disconnect the user's eBay account by removing stored tokens.
     """
@@ -463,6 +615,7 @@ async def disconnect_ebay_account(db: Session = Depends(get_db)):
         user_id = 1  # In production, get from session/JWT
         
         ebay_oauth.disconnect_user(db, user_id)
+        clear_policy_cache(user_id)
         
         return {
             "status": "success",
@@ -470,7 +623,7 @@ async def disconnect_ebay_account(db: Session = Depends(get_db)):
         }
         
     except Exception as e:
-        logger.error(f"Error disconnecting eBay account: {str(e)}")
+        logger.error("Error disconnecting eBay account: %s", e)
         raise HTTPException(
             status_code=500,
             detail="Failed to disconnect eBay account"
@@ -478,37 +631,63 @@ async def disconnect_ebay_account(db: Session = Depends(get_db)):
 
 # --- Static Routes ---
 
-@app.get("/", response_class=FileResponse)
-async def read_root():
-    index_path = STATIC_DIR / "index.html"
-    if not index_path.is_file():
+def index_not_modified(request: Request, etag: str) -> bool:
+    """Check the conditional request headers against the selected index page variant."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # If-None-Match takes precedence over If-Modified-Since when both are sent
+        return etag_matches(if_none_match, etag)
+    return request.headers.get("if-modified-since") == INDEX_LAST_MODIFIED
+
+def index_page_response(request: Request) -> Response:
+    """Serve the cached index.html, brotli- or gzip-compressed when the client accepts it."""
+    if INDEX_HTML is None:
         return HTMLResponse(
             content="<h1>Error: index.html not found</h1><p>Please make sure the static/index.html file exists.</p>",
             status_code=404
         )
-    return FileResponse(index_path)
-
-@app.get("/auth/success")
-async def auth_success():
-    return FileResponse(STATIC_DIR / "index.html")
+    accept_encoding = request.headers.get("accept-encoding")
+    if INDEX_HTML_BR and accepts_encoding(accept_encoding, "br"):
+        content, headers = INDEX_HTML_BR, INDEX_BR_HEADERS
+    elif accepts_encoding(accept_encoding, "gzip"):
+        content, headers = INDEX_HTML_GZIP, INDEX_GZIP_HEADERS
+    else:
+        content, headers = INDEX_HTML, INDEX_HEADERS
+    if index_not_modified(request, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    return Response(content=content, media_type=INDEX_MEDIA_TYPE, headers=headers)
+
+@app.get("/", response_class=HTMLResponse)
+async def read_root(request: Request):
+    return index_page_response(request)
+
+@app.get("/auth/success", response_class=HTMLResponse)
+async def auth_success(request: Request):
+    return index_page_response(request)
+
+# The health payload only depends on the OAuth settings, so it is encoded once.
+HEALTH_BODY = orjson.dumps({
+    "status": "ok",
+    "service": "ebay-dropshipping-spy",
+    "ebay_oauth": {
+        "client_id": "configured" if OAUTH_ENV["EBAY_CLIENT_ID"] else "missing",
+        "client_secret": "configured" if OAUTH_ENV["EBAY_CLIENT_SECRET"] else "missing",
+        "redirect_uri": "configured" if OAUTH_ENV["EBAY_REDIRECT_URI"] else "missing",
+        "encryption_key": "configured" if OAUTH_ENV["ENCRYPTION_KEY"] else "missing"
+    }
+})
+HEALTH_HEADERS = {"Cache-Control": "no-cache"}
 
 @app.get("/health")
 async def health_check():
-    return {
-        "status": "ok",
-        "service": "ebay-dropshipping-spy",
-        "ebay_oauth": {
-            "client_id": "configured" if os.getenv("EBAY_CLIENT_ID") else "missing",
-            "client_secret": "configured" if os.getenv("EBAY_CLIENT_SECRET") else "missing",
-            "redirect_uri": "configured" if os.getenv("EBAY_REDIRECT_URI") else "missing",
-            "encryption_key": "configured" if os.getenv("ENCRYPTION_KEY") else "missing"
-        }
-    }
+    return Response(content=HEALTH_BODY, media_type="application/json", headers=HEALTH_HEADERS)
 
 if __name__ == "__main__":
     uvicorn.run(
         "app.main:app",
         host="127.0.0.1",
         port=8000,
-        reload=True
+        reload=True,
+        loop="uvloop",
+        http="httptools"
     )
\ No newline at end of file
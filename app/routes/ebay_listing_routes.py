@@ -6,73 +6,101 @@ API routes for creating and managing eBay listings using the eBay Sell API.
 Handles inventory creation, listing management, and automated product listing.
 """
 
+import asyncio
 import logging
-from typing import Dict, Any, Optional, List
+import time
+import uuid
+from functools import wraps
+from typing import Annotated, Dict, Any, Optional, List, Tuple
 from datetime import datetime, timedelta
-from fastapi import APIRouter, HTTPException, Depends
-from pydantic import BaseModel, validator
+from fastapi import APIRouter, HTTPException, Depends, Request
+from fastapi.responses import Response
+from pydantic import BaseModel, Field, StringConstraints, field_validator
 from sqlalchemy.orm import Session
 
 from app.database import get_db
-from app.ebay_api_client import get_user_ebay_client
-from app.ebay_oauth_service import EbayOAuthService
+from app.http_cache import StaticJSONResponse
+from app.keyed_locks import KeyedLocks
+from app.ebay_api_client import EbayAPIClient, EbayAPIError, get_user_ebay_client
+from app.ebay_oauth_service import ebay_oauth
 from app import crud
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/ebay", tags=["ebay-listing"])
 
-# Initialize OAuth service
-ebay_oauth = EbayOAuthService()
+async def get_authenticated_ebay_client(db: Session = Depends(get_db)) -> EbayAPIClient:
+    """
+    Resolve the user's eBay access token once per request and return a client
+    that reuses it for every call, instead of re-reading the token each time.
+    """
+    user_id = 1  # In production, get from session/JWT
+    
+    access_token = await ebay_oauth.get_valid_access_token(db, user_id)
+    if not access_token:
+        raise HTTPException(
+            status_code=401,
+            detail="eBay account not connected. Please connect your eBay account first."
+        )
+    return get_user_ebay_client(user_id, access_token=access_token)
+
+# Default policy IDs rarely change, so they are cached per user for an hour:
+# (user_id, policy type) -> (policy ID, monotonic expiry)
+POLICY_CACHE_TTL = 3600
+_policy_cache: Dict[Tuple[Optional[int], str], Tuple[str, float]] = {}
+_policy_locks = KeyedLocks()
+
+def clear_policy_cache(user_id: Optional[int]) -> None:
+    """Forget the cached policy IDs for a user whose eBay account changed."""
+    for key in [key for key in list(_policy_cache) if key[0] == user_id]:
+        _policy_cache.pop(key, None)
+
+def cache_default_policy(policy_type: str, fallback_id: str):
+    """
+    Cache a get_default_*_policy lookup per user. Concurrent cold lookups for
+    the same user share one request; the fallback ID is never cached.
+    """
+    def decorator(func):
+        @wraps(func)
+        async def wrapper(client) -> str:
+            key = (client.user_id, policy_type)
+            cached = _policy_cache.get(key)
+            if cached and time.monotonic() < cached[1]:
+                return cached[0]
+
+            async with _policy_locks.hold(key):
+                cached = _policy_cache.get(key)
+                if cached and time.monotonic() < cached[1]:
+                    return cached[0]
+
+                policy_id = await func(client)
+                if policy_id != fallback_id:
+                    _policy_cache[key] = (policy_id, time.monotonic() + POLICY_CACHE_TTL)
+                return policy_id
+        return wrapper
+    return decorator
 
 class EbayListingRequest(BaseModel):
     """Request model for creating eBay listings."""
-    title: str
+    # Constraints are declared on the fields so pydantic-core checks them
+    # without calling back into Python validators.
+    title: Annotated[str, StringConstraints(strip_whitespace=True, min_length=1, max_length=80)]
     description: str
-    price: float
-    quantity: int = 1
+    price: float = Field(gt=0, le=99999.99)
+    quantity: int = Field(default=1, ge=1, le=1000)
     category_id: str = "182094"  # Default to "Cell Phones & Accessories"
     condition: str = "NEW"
-    image_urls: List[str] = []
+    image_urls: List[Annotated[str, StringConstraints(pattern=r"^https?://")]] = Field(default_factory=list, max_length=12)
     item_specifics: Dict[str, str] = {}
     listing_duration: str = "GTC"  # Good Till Cancelled
     return_policy: Optional[str] = None
     shipping_policy: Optional[str] = None
     payment_policy: Optional[str] = None
     
-    @validator('title')
-    def validate_title(cls, v):
-        if not v or len(v.strip()) == 0:
-            raise ValueError("Title is required")
-        if len(v) > 80:
-            raise ValueError("Title must be 80 characters or less")
-        return v.strip()
-    
-    @validator('price')
-    def validate_price(cls, v):
-        if v <= 0:
-            raise ValueError("Price must be greater than 0")
-        if v > 99999.99:
-            raise ValueError("Price too high")
+    @field_validator('price')
+    @classmethod
+    def round_price(cls, v):
         return round(v, 2)
-    
-    @validator('quantity')
-    def validate_quantity(cls, v):
-        if v < 1:
-            raise ValueError("Quantity must be at least 1")
-        if v > 1000:
-            raise ValueError("Quantity too high")
-        return v
-    
-    @validator('image_urls')
-    def validate_images(cls, v):
-        if len(v) > 12:
-            raise ValueError("Maximum 12 images allowed")
-        # Basic URL validation
-        for url in v:
-            if not url.startswith(('http://', 'https://')):
-                raise ValueError(f"Invalid image URL: {url}")
-        return v
 
 class EbayListingResponse(BaseModel):
     """Response model for eBay listing creation."""
@@ -87,7 +115,7 @@ class EbayListingResponse(BaseModel):
 @router.post("/listing", response_model=EbayListingResponse)
 async def create_ebay_listing(
     request: EbayListingRequest,
-    db: Session = Depends(get_db)
+    client: EbayAPIClient = Depends(get_authenticated_ebay_client)
 ):
     """
     Create a new eBay listing using the Sell Inventory API.
@@ -104,22 +132,10 @@ async def create_ebay_listing(
         Listing creation result with eBay item ID and listing URL
     """
     try:
-        user_id = 1  # In production, get from session/JWT
-        
-        # Check if user is connected to eBay
-        if not ebay_oauth.is_user_connected(db, user_id):
-            raise HTTPException(
-                status_code=401,
-                detail="eBay account not connected. Please connect your eBay account first."
-            )
+        logger.info("Creating eBay listing for user %s: %s", client.user_id, request.title)
         
-        logger.info(f"Creating eBay listing for user {user_id}: {request.title}")
-        
-        # Get authenticated eBay client
-        client = get_user_ebay_client(user_id)
-        
-        # Generate unique SKU
-        sku = f"AMZ-{datetime.now().strftime('%Y%m%d-%H%M%S')}"
+        # Generate unique SKU; random so concurrent listings never collide
+        sku = f"AMZ-{uuid.uuid4().hex[:16]}"
         
         # Step 1: Create Inventory Item
         inventory_item = await create_inventory_item(client, sku, request)
@@ -138,7 +154,7 @@ async def create_ebay_listing(
         ebay_item_id = publish_response.get('listingId')
         listing_url = f"https://www.ebay.com/itm/{ebay_item_id}" if ebay_item_id else None
         
-        logger.info(f"Successfully created eBay listing: {ebay_item_id}")
+        logger.info("Successfully created eBay listing: %s", ebay_item_id)
         
         return EbayListingResponse(
             success=True,
@@ -151,12 +167,14 @@ async def create_ebay_listing(
         
     except HTTPException:
         raise
+    except EbayAPIError as e:
+        logger.error("eBay API error creating listing: %s", e)
+        raise HTTPException(status_code=e.status_code or 502, detail=str(e))
     except Exception as e:
-        logger.error(f"Error creating eBay listing: {str(e)}")
-        return EbayListingResponse(
-            success=False,
-            message="Failed to create eBay listing",
-            errors=[str(e)]
+        logger.error("Error creating eBay listing: %s", e)
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to create eBay listing: {e}"
         )
 
 async def create_inventory_item(client, sku: str, request: EbayListingRequest) -> Dict[str, Any]:
@@ -169,7 +187,7 @@ async def create_inventory_item(client, sku: str, request: EbayListingRequest) -
             "description": request.description,
             "aspects": request.item_specifics,
             "brand": request.item_specifics.get("Brand", "Unbranded"),
-            "imageUrls": request.image_urls[:12]  # Limit to 12 images
+            "imageUrls": request.image_urls  # At most 12, enforced by EbayListingRequest
         }
     }
     
@@ -185,12 +203,25 @@ async def create_inventory_item(client, sku: str, request: EbayListingRequest) -
         json_data=product_data
     )
     
-    logger.info(f"Created inventory item with SKU: {sku}")
+    logger.info("Created inventory item with SKU: %s", sku)
     return response
 
 async def create_offer(client, sku: str, request: EbayListingRequest) -> Dict[str, Any]:
     """Create an offer for the inventory item."""
     
+    if request.shipping_policy and request.payment_policy and request.return_policy:
+        # All policies given, as for repeat listings: nothing to look up
+        fulfillment_policy_id = request.shipping_policy
+        payment_policy_id = request.payment_policy
+        return_policy_id = request.return_policy
+    else:
+        # Look up any missing default policies concurrently
+        fulfillment_policy_id, payment_policy_id, return_policy_id = await asyncio.gather(
+            resolve_policy(request.shipping_policy, get_default_shipping_policy, client),
+            resolve_policy(request.payment_policy, get_default_payment_policy, client),
+            resolve_policy(request.return_policy, get_default_return_policy, client)
+        )
+    
     # Prepare offer data
     offer_data = {
         "sku": sku,
@@ -200,9 +231,9 @@ async def create_offer(client, sku: str, request: EbayListingRequest) -> Dict[st
         "categoryId": request.category_id,
         "listingDescription": request.description,
         "listingPolicies": {
-            "fulfillmentPolicyId": request.shipping_policy or await get_default_shipping_policy(client),
-            "paymentPolicyId": request.payment_policy or await get_default_payment_policy(client),
-            "returnPolicyId": request.return_policy or await get_default_return_policy(client)
+            "fulfillmentPolicyId": fulfillment_policy_id,
+            "paymentPolicyId": payment_policy_id,
+            "returnPolicyId": return_policy_id
         },
         "pricingSummary": {
             "price": {
@@ -221,7 +252,7 @@ async def create_offer(client, sku: str, request: EbayListingRequest) -> Dict[st
         json_data=offer_data
     )
     
-    logger.info(f"Created offer for SKU: {sku}")
+    logger.info("Created offer for SKU: %s", sku)
     return response
 
 async def publish_listing(client, offer_id: str) -> Dict[str, Any]:
@@ -237,9 +268,16 @@ async def publish_listing(client, offer_id: str) -> Dict[str, Any]:
         json_data=publish_data
     )
     
-    logger.info(f"Published listing for offer: {offer_id}")
+    logger.info("Published listing for offer: %s", offer_id)
     return response
 
+async def resolve_policy(policy_id: Optional[str], get_default, client) -> str:
+    """Return the given policy ID, or look up the default one if it is missing."""
+    if policy_id:
+        return policy_id
+    return await get_default(client)
+
+@cache_default_policy("shipping", "DEFAULT_SHIPPING_POLICY")
 async def get_default_shipping_policy(client) -> str:
     """Get or create a default shipping policy."""
     try:
@@ -275,9 +313,10 @@ async def get_default_shipping_policy(client) -> str:
         return response["fulfillmentPolicyId"]
         
     except Exception as e:
-        logger.warning(f"Could not get shipping policy: {e}")
+        logger.warning("Could not get shipping policy: %s", e)
         return "DEFAULT_SHIPPING_POLICY"
 
+@cache_default_policy("payment", "DEFAULT_PAYMENT_POLICY")
 async def get_default_payment_policy(client) -> str:
     """Get or create a default payment policy."""
     try:
@@ -305,9 +344,10 @@ async def get_default_payment_policy(client) -> str:
         return response["paymentPolicyId"]
         
     except Exception as e:
-        logger.warning(f"Could not get payment policy: {e}")
+        logger.warning("Could not get payment policy: %s", e)
         return "DEFAULT_PAYMENT_POLICY"
 
+@cache_default_policy("return", "DEFAULT_RETURN_POLICY")
 async def get_default_return_policy(client) -> str:
     """Get or create a default return policy."""
     try:
@@ -336,27 +376,19 @@ async def get_default_return_policy(client) -> str:
         return response["returnPolicyId"]
         
     except Exception as e:
-        logger.warning(f"Could not get return policy: {e}")
+        logger.warning("Could not get return policy: %s", e)
         return "DEFAULT_RETURN_POLICY"
 
 @router.get("/policies")
-async def get_user_policies(db: Session = Depends(get_db)):
+async def get_user_policies(client: EbayAPIClient = Depends(get_authenticated_ebay_client)):
     """Get user's eBay business policies."""
     try:
-        user_id = 1  # In production, get from session/JWT
-        
-        if not ebay_oauth.is_user_connected(db, user_id):
-            raise HTTPException(
-                status_code=401,
-                detail="eBay account not connected"
-            )
-        
-        client = get_user_ebay_client(user_id)
-        
-        # Get all policy types
-        shipping_policies = await client.call_api("GET", "/sell/account/v1/fulfillment_policy")
-        payment_policies = await client.call_api("GET", "/sell/account/v1/payment_policy")
-        return_policies = await client.call_api("GET", "/sell/account/v1/return_policy")
+        # Get all policy types; the three lookups are independent, so run them concurrently
+        shipping_policies, payment_policies, return_policies = await asyncio.gather(
+            client.call_api("GET", "/sell/account/v1/fulfillment_policy"),
+            client.call_api("GET", "/sell/account/v1/payment_policy"),
+            client.call_api("GET", "/sell/account/v1/return_policy")
+        )
         
         return {
             "shipping_policies": shipping_policies.get("fulfillmentPolicies", []),
@@ -365,27 +397,28 @@ async def get_user_policies(db: Session = Depends(get_db)):
         }
         
     except Exception as e:
-        logger.error(f"Error fetching policies: {str(e)}")
+        logger.error("Error fetching policies: %s", e)
         raise HTTPException(
             status_code=500,
             detail="Failed to fetch eBay policies"
         )
 
+# Common categories for dropshipping; static, so the response is encoded once
+EBAY_CATEGORIES = {
+    "182094": "Cell Phones & Accessories",
+    "293": "Consumer Electronics",
+    "1281": "Jewelry & Watches", 
+    "11450": "Clothing, Shoes & Accessories",
+    "2984": "Sporting Goods",
+    "11232": "Video Games & Consoles",
+    "58058": "Health & Beauty",
+    "26395": "Pet Supplies",
+    "1249": "Video Games",
+    "11233": "Video Game Accessories"
+}
+EBAY_CATEGORIES_RESPONSE = StaticJSONResponse({"categories": EBAY_CATEGORIES})
+
 @router.get("/categories")
-async def get_ebay_categories():
+async def get_ebay_categories(request: Request) -> Response:
     """Get common eBay categories for listing."""
-    # Common categories for dropshipping
-    categories = {
-        "182094": "Cell Phones & Accessories",
-        "293": "Consumer Electronics",
-        "1281": "Jewelry & Watches", 
-        "11450": "Clothing, Shoes & Accessories",
-        "2984": "Sporting Goods",
-        "11232": "Video Games & Consoles",
-        "58058": "Health & Beauty",
-        "26395": "Pet Supplies",
-        "1249": "Video Games",
-        "11233": "Video Game Accessories"
-    }
-    
-    return {"categories": categories} 
\ No newline at end of file
+    return EBAY_CATEGORIES_RESPONSE.respond(request)
@@ -1,24 +1,17 @@
+import asyncio
 import logging
-from typing import Dict, Any, Optional, List
+import time
+from collections import OrderedDict
+from functools import partial
+from typing import Dict, Any, Optional, List, Tuple
 from enum import Enum
-from datetime import datetime, timezone
-import sys
-import os
 import random
 
-# Add the project root to Python path
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import Response
 
-try:
-    from fastapi import APIRouter, HTTPException, Query, Depends
-except ImportError:
-    raise ImportError("FastAPI is required. Please install it with: pip install fastapi")
-
-# Import the API client
-try:
-    from app.ebay_api_client import ebay_client, EbayAPIError
-except ImportError:
-    from ebay_api_client import ebay_client, EbayAPIError
+from app.ebay_api_client import ebay_client, EbayAPIError
+from app.http_cache import OrjsonResponse, StaticJSONResponse
 
 logger = logging.getLogger(__name__)
 
@@ -61,6 +54,69 @@ def prepare_search_keywords(keyword: str) -> str:
     
     return keyword
 
+# Identical searches within this window reuse eBay's response (results are
+# shuffled per request afterwards), and concurrent duplicates share one call.
+SEARCH_CACHE_TTL = 60
+# Each entry is a full Browse response, so cap how many distinct searches are
+# kept; the oldest entry is evicted first
+SEARCH_CACHE_MAX_ENTRIES = 256
+# Kept in insertion order, which with a fixed TTL is also expiry order
+_search_cache: "OrderedDict[Tuple, Tuple[Optional[Dict[str, Any]], float]]" = OrderedDict()
+_search_inflight: Dict[Tuple, asyncio.Task] = {}
+
+async def _call_search_api(key: Tuple, params: Dict[str, Any], headers: Dict[str, str]) -> Optional[Dict[str, Any]]:
+    """Call the Browse search API and cache the response under key."""
+    results = await ebay_client.call_api(
+        method='GET',
+        endpoint='/buy/browse/v1/item_summary/search',
+        params=params,
+        headers=headers
+    )
+    now = time.monotonic()
+    while _search_cache and next(iter(_search_cache.values()))[1] <= now:
+        _search_cache.popitem(last=False)
+    _search_cache[key] = (results, now + SEARCH_CACHE_TTL)
+    _search_cache.move_to_end(key)
+    while len(_search_cache) > SEARCH_CACHE_MAX_ENTRIES:
+        _search_cache.popitem(last=False)
+    return results
+
+def _finish_search(key: Tuple, task: asyncio.Task) -> None:
+    """Forget a finished search call; marks its exception as retrieved if every caller left."""
+    _search_inflight.pop(key, None)
+    if not task.cancelled():
+        task.exception()
+
+def search_cache_key(params: Dict[str, Any], headers: Dict[str, str]) -> Tuple:
+    """
+    Canonical cache key for a search. eBay matches keywords case-insensitively
+    and ignores extra whitespace and category order, so those are normalized
+    to let equivalent searches share an entry.
+    """
+    canonical = dict(params)
+    canonical["q"] = " ".join(str(params.get("q", "")).lower().split())
+    if "category_ids" in canonical:
+        canonical["category_ids"] = ",".join(sorted(canonical["category_ids"].split(",")))
+    return (tuple(sorted(canonical.items())), tuple(sorted(headers.items())))
+
+async def fetch_search_results(params: Dict[str, Any], headers: Dict[str, str]) -> Optional[Dict[str, Any]]:
+    """
+    Return eBay search results for these params, from the cache when fresh.
+    Concurrent identical searches await the same in-flight request; a caller
+    disconnecting does not cancel it for the others.
+    """
+    key = search_cache_key(params, headers)
+    cached = _search_cache.get(key)
+    if cached and time.monotonic() < cached[1]:
+        return cached[0]
+    
+    task = _search_inflight.get(key)
+    if task is None:
+        task = asyncio.create_task(_call_search_api(key, params, headers))
+        _search_inflight[key] = task
+        task.add_done_callback(partial(_finish_search, key))
+    return await asyncio.shield(task)
+
 @router.get("/search")
 async def search_products(
     keyword: str = Query(..., min_length=1, max_length=200, description="Search keyword"),
@@ -78,14 +134,14 @@ async def search_products(
     max_seller_feedback: Optional[int] = Query(None, ge=0, description="Maximum seller feedback score"),
     item_location_country: Optional[str] = Query(None, description="Item location country (e.g., US, GB, DE)"),
     search_mode: str = Query("enhanced", description="Search mode - 'enhanced', 'exact', 'broad'")
-) -> Dict[str, Any]:
+) -> OrjsonResponse:
     """
     Clean and simple eBay product search with essential filtering options.
     """
     try:
         logger.info(
-            f"Search triggered with Keyword: '{keyword}', Limit: {limit}, "
-            f"Feedback Range: {min_seller_feedback}-{max_seller_feedback}"
+            "Search triggered with Keyword: '%s', Limit: %s, Feedback Range: %s-%s",
+            keyword, limit, min_seller_feedback, max_seller_feedback
         )
         
         # Process keywords based on search mode
@@ -143,7 +199,7 @@ async def search_products(
         # Always fetch a larger pool of items to allow for shuffling and variety.
         user_requested_limit = limit
         api_limit = 200  # Max limit for eBay Browse API
-        logger.info(f"API limit set to {api_limit} to provide varied results.")
+        logger.info("API limit set to %s to provide varied results.", api_limit)
 
         # Call eBay Browse API
         params = {
@@ -167,63 +223,47 @@ async def search_products(
             "X-EBAY-C-ENDUSERCTX": f"contextualLocation=country={marketplace.split('_')[1]}"
         }
         
-        logger.info(f"Calling eBay API with params: {params}")
-        results = await ebay_client.call_api(
-            method='GET',
-            endpoint='/buy/browse/v1/item_summary/search',
-            params=params,
-            headers=headers
-        )
+        logger.info("Calling eBay API with params: %s", params)
+        results = await fetch_search_results(params, headers)
 
         # If the API call fails or returns nothing, exit gracefully.
         if not results:
             logger.warning("eBay API returned no results. Returning empty list.")
-            return {
+            return OrjsonResponse({
                 "success": True,
                 "results": [],
                 "total_found": 0,
                 "search_metadata": {"message": "No results from eBay API."}
-            }
+            })
         
         # Process the results
         processed_results = process_ebay_results(results, marketplace)
-        logger.info(f"Received {len(processed_results.get('items', []))} items from eBay.")
+        logger.info("Received %s items from eBay.", len(processed_results.get('items', [])))
         
-        # Apply post-search filters (for criteria not supported by eBay's API filter)
-        final_items = []
-        for item in processed_results.get("items", []):
-            # Price range check (as a safeguard)
+        # Apply post-search filters (for criteria not supported by eBay's API filter).
+        # Price is re-checked as a safeguard; seller feedback was already made an
+        # int by process_ebay_results, so it is compared directly.
+        check_feedback = min_seller_feedback is not None or max_seller_feedback is not None
+        min_feedback = min_seller_feedback if min_seller_feedback is not None else float("-inf")
+        max_feedback = max_seller_feedback if max_seller_feedback is not None else float("inf")
+        
+        def passes_filters(item: Dict[str, Any]) -> bool:
             try:
-                price_value = float(item.get("price", {}).get("value", 0))
-                if not is_price_in_range(price_value):
-                    continue
+                price_value = float(item["price"].get("value", 0))
             except (ValueError, TypeError):
-                continue
-
-            # Seller feedback score filter
-            if min_seller_feedback is not None or max_seller_feedback is not None:
-                try:
-                    seller_feedback = int(item.get("seller", {}).get("feedback_score", 0))
-                    if min_seller_feedback is not None and seller_feedback < min_seller_feedback:
-                        continue
-                    if max_seller_feedback is not None and seller_feedback > max_seller_feedback:
-                        continue
-                except (ValueError, TypeError):
-                    # If feedback score is invalid, it cannot match the filter
-                    continue
-            
-            final_items.append(item)
+                return False
+            if not is_price_in_range(price_value):
+                return False
+            return not check_feedback or min_feedback <= item["seller"]["feedback_score"] <= max_feedback
         
-        logger.info(f"Found {len(final_items)} items after applying all filters.")
-
-        # --- NEW: Shuffle results for variety ---
-        random.shuffle(final_items)
-        logger.info("Shuffled results to provide variety on each search.")
+        final_items = [item for item in processed_results["items"] if passes_filters(item)]
+        logger.info("Found %s items after applying all filters.", len(final_items))
 
-        # Truncate results to the user's originally requested limit
+        # Pick a random subset in random order for variety on each search; sampling
+        # only touches the items returned instead of shuffling the whole pool
         if len(final_items) > user_requested_limit:
-            final_items = final_items[:user_requested_limit]
-            logger.info(f"Truncating results to user's limit of {user_requested_limit}.")
+            logger.info("Truncating results to user's limit of %s.", user_requested_limit)
+        final_items = random.sample(final_items, min(len(final_items), user_requested_limit))
 
         # Create search metadata
         search_metadata = {
@@ -249,88 +289,29 @@ async def search_products(
             "total_available": results.get("total", 0)
         }
         
-        # Return clean results
-        return {
+        # Return clean results; the dict is already JSON-ready, so hand it straight to orjson
+        return OrjsonResponse({
             "success": True,
             "results": final_items,
             "total_found": len(final_items),
             "search_metadata": search_metadata
-        }
+        })
         
     except EbayAPIError as e:
-        logger.error(f"Caught EbayAPIError in search_products: {e.message}")
+        logger.error("Caught EbayAPIError in search_products: %s", e.message)
         raise HTTPException(
             status_code=e.status_code or 500,
             detail={"error": "eBay API Error", "message": e.message}
         )
     except Exception as e:
-        logger.error(f"Unexpected error in search_products: {str(e)}")
+        logger.error("Unexpected error in search_products: %s", e)
         raise HTTPException(status_code=500, detail=f"An unexpected error occurred: {str(e)}")
 
 def process_ebay_results(ebay_response: Dict[str, Any], marketplace: str) -> Dict[str, Any]:
     """
     Process eBay API response and extract essential product information.
     """
-    items = []
-    
-    for item in ebay_response.get("itemSummaries", []):
-        item_id = item.get("itemId")
-        
-        # Extract seller information
-        seller_info = item.get("seller", {})
-        seller = {
-            "username": seller_info.get("username"),
-            "feedback_score": int(seller_info.get("feedbackScore", 0)),  # Ensure integer
-            "feedback_percentage": seller_info.get("feedbackPercentage"),
-            "top_rated_seller": seller_info.get("topRatedSeller", False),
-            "business_seller": seller_info.get("sellerAccountType") == "BUSINESS"
-        }
-        
-        # Extract clean, essential data
-        processed_item = {
-            "item_id": item_id,
-            "title": item.get("title"),
-            "price": item.get("price", {}),
-            "condition": item.get("condition"),
-            "condition_id": item.get("conditionId"),
-            
-            # Item links
-            "item_web_url": item.get("itemWebUrl"),
-            "view_item_url": item.get("itemWebUrl"),
-            
-            # Images
-            "image_url": item.get("image", {}).get("imageUrl"),
-            "thumbnail_images": item.get("thumbnailImages", []),
-            
-            # Category info
-            "categories": item.get("categories", []),
-            "primary_category": item.get("categories", [{}])[0] if item.get("categories") else {},
-            
-            # Shipping info
-            "shipping_options": item.get("shippingOptions", []),
-            "free_shipping": any(
-                option.get("shippingCost", {}).get("value") == "0.0" 
-                for option in item.get("shippingOptions", [])
-            ),
-            
-            # Seller information
-            "seller": seller,
-            
-            # Listing details
-            "buying_options": item.get("buyingOptions", []),
-            "listing_type": determine_listing_type(item.get("buyingOptions", [])),
-            
-            # Additional metadata
-            "returns_accepted": item.get("returnsAccepted", False),
-            "top_rated_buying_experience": item.get("topRatedBuyingExperience", False),
-            "item_location": item.get("itemLocation", {}),
-            "listing_end_date": item.get("listingEndDate"),
-            
-            # Simple market insights
-            "market_insights": extract_basic_market_insights(item)
-        }
-        
-        items.append(processed_item)
+    items = [process_ebay_item(item) for item in ebay_response.get("itemSummaries", [])]
     
     return {
         "items": items,
@@ -338,6 +319,73 @@ def process_ebay_results(ebay_response: Dict[str, Any], marketplace: str) -> Dic
         "marketplace": marketplace
     }
 
+def process_ebay_item(item: Dict[str, Any]) -> Dict[str, Any]:
+    """Extract the essential fields of a single eBay item summary."""
+    # Extract seller information
+    seller_info = item.get("seller", {})
+    seller = {
+        "username": seller_info.get("username"),
+        "feedback_score": int(seller_info.get("feedbackScore", 0)),  # Ensure integer
+        "feedback_percentage": seller_info.get("feedbackPercentage"),
+        "top_rated_seller": seller_info.get("topRatedSeller", False),
+        "business_seller": seller_info.get("sellerAccountType") == "BUSINESS"
+    }
+    
+    # Looked up once and shared with the market insights
+    categories = item.get("categories", [])
+    shipping_options = item.get("shippingOptions", [])
+    buying_options = item.get("buyingOptions", [])
+    listing_type = determine_listing_type(buying_options)
+    free_shipping = has_free_shipping(shipping_options)
+    
+    # Extract clean, essential data
+    return {
+        "item_id": item.get("itemId"),
+        "title": item.get("title"),
+        "price": item.get("price", {}),
+        "condition": item.get("condition"),
+        "condition_id": item.get("conditionId"),
+        
+        # Item links
+        "item_web_url": item.get("itemWebUrl"),
+        "view_item_url": item.get("itemWebUrl"),
+        
+        # Images
+        "image_url": item.get("image", {}).get("imageUrl"),
+        "thumbnail_images": item.get("thumbnailImages", []),
+        
+        # Category info
+        "categories": categories,
+        "primary_category": categories[0] if categories else {},
+        
+        # Shipping info
+        "shipping_options": shipping_options,
+        "free_shipping": free_shipping,
+        
+        # Seller information
+        "seller": seller,
+        
+        # Listing details
+        "buying_options": buying_options,
+        "listing_type": listing_type,
+        
+        # Additional metadata
+        "returns_accepted": item.get("returnsAccepted", False),
+        "top_rated_buying_experience": item.get("topRatedBuyingExperience", False),
+        "item_location": item.get("itemLocation", {}),
+        "listing_end_date": item.get("listingEndDate"),
+        
+        # Simple market insights
+        "market_insights": extract_basic_market_insights(item, listing_type, free_shipping)
+    }
+
+def has_free_shipping(shipping_options: List[Dict[str, Any]]) -> bool:
+    """Check whether any shipping option is free."""
+    return any(
+        option.get("shippingCost", {}).get("value") == "0.0"
+        for option in shipping_options
+    )
+
 def determine_listing_type(buying_options: List[str]) -> str:
     """Determine listing type from buying options."""
     if "AUCTION" in buying_options:
@@ -347,8 +395,8 @@ def determine_listing_type(buying_options: List[str]) -> str:
     else:
         return "UNKNOWN"
 
-def extract_basic_market_insights(item: Dict[str, Any]) -> Dict[str, Any]:
-    """Extract basic market insights from eBay data."""
+def extract_basic_market_insights(item: Dict[str, Any], listing_type: str, free_shipping: bool) -> Dict[str, Any]:
+    """Extract basic market insights from eBay data, reusing the item's computed listing type and shipping."""
     insights = {}
     
     # Price analysis
@@ -368,64 +416,64 @@ def extract_basic_market_insights(item: Dict[str, Any]) -> Dict[str, Any]:
     
     # Basic market positioning
     insights["market_position"] = {
-        "listing_type": determine_listing_type(item.get("buyingOptions", [])),
-        "has_free_shipping": any(
-            option.get("shippingCost", {}).get("value") == "0.0" 
-            for option in item.get("shippingOptions", [])
-        ),
+        "listing_type": listing_type,
+        "has_free_shipping": free_shipping,
         "has_coupons": item.get("availableCoupons", False)
     }
     
     return insights
 
-@router.get("/categories")
-async def get_popular_categories() -> Dict[str, Any]:
-    """Get popular eBay categories for filtering."""
-    return {
-        "popular_categories": {
-            "Electronics": {
-                "category_id": "58058",
-                "subcategories": {
-                    "Cell Phones & Accessories": "15032",
-                    "Computers & Tablets": "58058", 
-                    "Consumer Electronics": "293",
-                    "Video Games": "1249"
-                }
-            },
-            "Fashion": {
-                "category_id": "11450",
-                "subcategories": {
-                    "Men's Clothing": "1059",
-                    "Women's Clothing": "15724",
-                    "Shoes": "93427",
-                    "Jewelry": "281"
-                }
-            },
-            "Home & Garden": {
-                "category_id": "11700",
-                "subcategories": {
-                    "Home Décor": "20081",
-                    "Kitchen & Dining": "20625",
-                    "Tools & Hardware": "631",
-                    "Garden & Patio": "159912"
-                }
-            },
-            "Sports & Outdoors": {
-                "category_id": "888",
-                "subcategories": {
-                    "Fitness Equipment": "15273",
-                    "Outdoor Sports": "159043",
-                    "Team Sports": "64482"
-                }
-            },
-            "Automotive": {
-                "category_id": "6000",
-                "subcategories": {
-                    "Parts & Accessories": "6030",
-                    "Motorcycles": "6024",
-                    "Boats": "26429"
-                }
+# Static category list, encoded once at import
+POPULAR_CATEGORIES_RESPONSE = StaticJSONResponse({
+    "popular_categories": {
+        "Electronics": {
+            "category_id": "58058",
+            "subcategories": {
+                "Cell Phones & Accessories": "15032",
+                "Computers & Tablets": "58058", 
+                "Consumer Electronics": "293",
+                "Video Games": "1249"
+            }
+        },
+        "Fashion": {
+            "category_id": "11450",
+            "subcategories": {
+                "Men's Clothing": "1059",
+                "Women's Clothing": "15724",
+                "Shoes": "93427",
+                "Jewelry": "281"
             }
         },
-        "note": "Use these category IDs in the category_ids parameter to filter search results."
-    }
\ No newline at end of file
+        "Home & Garden": {
+            "category_id": "11700",
+            "subcategories": {
+                "Home Décor": "20081",
+                "Kitchen & Dining": "20625",
+                "Tools & Hardware": "631",
+                "Garden & Patio": "159912"
+            }
+        },
+        "Sports & Outdoors": {
+            "category_id": "888",
+            "subcategories": {
+                "Fitness Equipment": "15273",
+                "Outdoor Sports": "159043",
+                "Team Sports": "64482"
+            }
+        },
+        "Automotive": {
+            "category_id": "6000",
+            "subcategories": {
+                "Parts & Accessories": "6030",
+                "Motorcycles": "6024",
+                "Boats": "26429"
+            }
+        }
+    },
+    "note": "Use these category IDs in the category_ids parameter to filter search results."
+})
+
+@router.get("/categories")
+async def get_popular_categories(request: Request) -> Response:
+    """Get popular eBay categories for filtering."""
+    return POPULAR_CATEGORIES_RESPONSE.respond(request)
@@ -16,12 +16,15 @@ Features:
 import re
 import logging
 import asyncio
-import json
-from typing import Dict, List, Optional, Any
+import orjson
+from typing import Dict, List, Optional, Any, TYPE_CHECKING
 from urllib.parse import urlparse, parse_qs
 import httpx
-from bs4 import BeautifulSoup
-from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeout
+
+# Playwright and BeautifulSoup are imported where they are used, so app
+# startup does not pay for them until the first product is scraped.
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup
 
 logger = logging.getLogger(__name__)
 
@@ -62,34 +65,34 @@ class AmazonProductScraper:
         try:
             # Clean and validate URL
             clean_url = self._clean_amazon_url(amazon_url)
-            logger.info(f"Scraping Amazon product: {clean_url}")
+            logger.info("Scraping Amazon product: %s", clean_url)
             
             # Try Playwright first (more reliable for complex pages)
             try:
                 logger.info("Attempting Playwright scraping...")
                 product_data = await self._scrape_with_playwright(clean_url)
                 if product_data.get('title'):
-                    logger.info(f"Playwright scraping successful: {product_data.get('title', '')[:50]}...")
+                    logger.info("Playwright scraping successful: %s...", product_data.get('title', '')[:50])
                     return self._ensure_complete_data(product_data)
             except Exception as e:
-                logger.warning(f"Playwright scraping failed: {str(e)}")
+                logger.warning("Playwright scraping failed: %s", e)
             
             # Fallback to requests + BeautifulSoup
             try:
                 logger.info("Attempting requests + BeautifulSoup scraping...")
                 product_data = await self._scrape_with_requests(clean_url)
                 if product_data.get('title'):
-                    logger.info(f"Requests scraping successful: {product_data.get('title', '')[:50]}...")
+                    logger.info("Requests scraping successful: %s...", product_data.get('title', '')[:50])
                     return self._ensure_complete_data(product_data)
             except Exception as e:
-                logger.warning(f"Requests scraping failed: {str(e)}")
+                logger.warning("Requests scraping failed: %s", e)
             
             # If both methods fail, return mock data for testing
             logger.error("All scraping methods failed - returning mock data for testing")
             return self._get_mock_data(clean_url)
             
         except Exception as e:
-            logger.error(f"Error scraping Amazon product: {str(e)}")
+            logger.error("Error scraping Amazon product: %s", e)
             raise AmazonScraperError(f"Scraping failed: {str(e)}")
     
     def _ensure_complete_data(self, data: Dict[str, Any]) -> Dict[str, Any]:
@@ -105,7 +108,7 @@ class AmazonProductScraper:
         if data['title']:
             data['title'] = self._optimize_title_length(data['title'], 80)
         
-        logger.info(f"Final data: title={data['title'][:30]}..., price={data['price']}, images={len(data['images'])}")
+        logger.info("Final data: title=%s..., price=%s, images=%s", data['title'][:30], data['price'], len(data['images']))
         return data
     
     def _get_mock_data(self, url: str) -> Dict[str, Any]:
@@ -161,6 +164,8 @@ class AmazonProductScraper:
     
     async def _scrape_with_playwright(self, url: str) -> Dict[str, Any]:
         """Scrape using Playwright for JavaScript-heavy pages."""
+        from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeout
+
         async with async_playwright() as p:
             browser = await p.chromium.launch(
                 headless=True,
@@ -190,7 +195,7 @@ class AmazonProductScraper:
                     except PlaywrightTimeout:
                         if attempt == 2:
                             raise
-                        logger.warning(f"Page load timeout, retrying... (attempt {attempt + 1})")
+                        logger.warning("Page load timeout, retrying... (attempt %s)", attempt + 1)
                         await asyncio.sleep(2)
                 
                 # Wait for content to load
@@ -227,7 +232,7 @@ class AmazonProductScraper:
             
             response = await client.get(url)
             
-            logger.info(f"Response status: {response.status_code}")
+            logger.info("Response status: %s", response.status_code)
             
             if response.status_code != 200:
                 raise AmazonScraperError(f"HTTP {response.status_code} error")
@@ -241,12 +246,14 @@ class AmazonProductScraper:
     
     def _parse_amazon_html(self, html_content: str) -> Dict[str, Any]:
         """Parse Amazon HTML and extract product data."""
+        from bs4 import BeautifulSoup
+
         soup = BeautifulSoup(html_content, 'html.parser')
         
         # Log page title for debugging
         page_title = soup.find('title')
         if page_title:
-            logger.info(f"Page title: {page_title.text[:100]}")
+            logger.info("Page title: %s", page_title.text[:100])
         
         product_data = {
             'title': self._extract_title(soup),
@@ -257,15 +264,15 @@ class AmazonProductScraper:
         }
         
         # Log extraction results
-        logger.info(f"Extracted - Title: {product_data['title'][:30] if product_data['title'] else 'None'}")
-        logger.info(f"Extracted - Price: {product_data['price']}")
-        logger.info(f"Extracted - Images: {len(product_data['images'])}")
-        logger.info(f"Extracted - Description length: {len(product_data['description'])}")
-        logger.info(f"Extracted - Specifics: {len(product_data['specifics'])}")
+        logger.info("Extracted - Title: %s", product_data['title'][:30] if product_data['title'] else 'None')
+        logger.info("Extracted - Price: %s", product_data['price'])
+        logger.info("Extracted - Images: %s", len(product_data['images']))
+        logger.info("Extracted - Description length: %s", len(product_data['description']))
+        logger.info("Extracted - Specifics: %s", len(product_data['specifics']))
         
         return product_data
     
-    def _extract_title(self, soup: BeautifulSoup) -> str:
+    def _extract_title(self, soup: "BeautifulSoup") -> str:
         """Extract and optimize product title."""
         title_selectors = [
             '#productTitle',
@@ -282,7 +289,7 @@ class AmazonProductScraper:
             element = soup.select_one(selector)
             if element:
                 title = element.get_text().strip()
-                logger.info(f"Found title with selector '{selector}': {title[:50]}...")
+                logger.info("Found title with selector '%s': %s...", selector, title[:50])
                 break
         
         if not title:
@@ -290,7 +297,7 @@ class AmazonProductScraper:
             h1 = soup.find('h1')
             if h1:
                 title = h1.get_text().strip()
-                logger.info(f"Found title in h1 tag: {title[:50]}...")
+                logger.info("Found title in h1 tag: %s...", title[:50])
         
         if not title:
             logger.warning("No title found in page")
@@ -342,7 +349,7 @@ class AmazonProductScraper:
         # Fallback: hard truncate
         return title[:max_length - 3] + "..."
     
-    def _extract_price(self, soup: BeautifulSoup) -> Optional[float]:
+    def _extract_price(self, soup: "BeautifulSoup") -> Optional[float]:
         """Extract product price."""
         price_selectors = [
             'span.a-price-whole',
@@ -361,7 +368,7 @@ class AmazonProductScraper:
             element = soup.select_one(selector)
             if element:
                 price_text = element.get_text().strip()
-                logger.info(f"Found price with selector '{selector}': {price_text}")
+                logger.info("Found price with selector '%s': %s", selector, price_text)
                 price = self._parse_price(price_text)
                 if price:
                     return price
@@ -372,11 +379,11 @@ class AmazonProductScraper:
             try:
                 script_text = script.get_text() if script else ""
                 if script_text:
-                    data = json.loads(script_text)
+                    data = orjson.loads(script_text)
                     if isinstance(data, dict) and 'offers' in data:
                         price = data['offers'].get('price')
                         if price:
-                            logger.info(f"Found price in JSON-LD: {price}")
+                            logger.info("Found price in JSON-LD: %s", price)
                             return float(price)
             except:
                 pass
@@ -392,14 +399,14 @@ class AmazonProductScraper:
         if price_match:
             try:
                 price = float(price_match.group(1))
-                logger.info(f"Parsed price: {price}")
+                logger.info("Parsed price: %s", price)
                 return price
             except ValueError:
                 pass
         
         return None
     
-    def _extract_images(self, soup: BeautifulSoup) -> List[str]:
+    def _extract_images(self, soup: "BeautifulSoup") -> List[str]:
         """Extract product images and clean URLs."""
         images = []
         seen_images = set()
@@ -430,7 +437,7 @@ class AmazonProductScraper:
                     if clean_url and clean_url not in seen_images:
                         images.append(clean_url)
                         seen_images.add(clean_url)
-                        logger.info(f"Found main image: {clean_url[:50]}...")
+                        logger.info("Found main image: %s...", clean_url[:50])
                         break
         
         # Then get alternate images
@@ -450,12 +457,12 @@ class AmazonProductScraper:
                 images.append(clean_url)
                 seen_images.add(clean_url)
         
-        logger.info(f"Total images found: {len(images)}")
+        logger.info("Total images found: %s", len(images))
         
         # Limit to first 12 images (eBay limit)
         return images[:12]
     
-    def _extract_images_from_scripts(self, soup: BeautifulSoup) -> List[str]:
+    def _extract_images_from_scripts(self, soup: "BeautifulSoup") -> List[str]:
         """Extract image URLs from JavaScript variables."""
         images = []
         
@@ -514,7 +521,7 @@ class AmazonProductScraper:
         
         return url
     
-    def _extract_description(self, soup: BeautifulSoup) -> str:
+    def _extract_description(self, soup: "BeautifulSoup") -> str:
         """Extract and clean product description."""
         description_parts = []
         
@@ -547,11 +554,11 @@ class AmazonProductScraper:
                     break
         
         final_description = "<br>".join(description_parts)
-        logger.info(f"Description length: {len(final_description)} characters")
+        logger.info("Description length: %s characters", len(final_description))
         
         return final_description
     
-    def _extract_feature_bullets(self, soup: BeautifulSoup) -> List[str]:
+    def _extract_feature_bullets(self, soup: "BeautifulSoup") -> List[str]:
         """Extract feature bullet points."""
         bullets = []
         seen_bullets = set()
@@ -574,10 +581,10 @@ class AmazonProductScraper:
                         bullets.append(self._clean_text(text))
                         seen_bullets.add(text)
         
-        logger.info(f"Found {len(bullets)} feature bullets")
+        logger.info("Found %s feature bullets", len(bullets))
         return bullets[:8]  # Limit to 8 bullets
     
-    def _extract_specifics(self, soup: BeautifulSoup) -> Dict[str, str]:
+    def _extract_specifics(self, soup: "BeautifulSoup") -> Dict[str, str]:
         """Extract item specifics like brand, dimensions, etc."""
         specifics = {}
         
@@ -642,7 +649,7 @@ class AmazonProductScraper:
             if key not in filtered_specifics and len(filtered_specifics) < 10:
                 filtered_specifics[key] = value
         
-        logger.info(f"Extracted {len(filtered_specifics)} item specifics")
+        logger.info("Extracted %s item specifics", len(filtered_specifics))
         return filtered_specifics
     
     def _clean_html_content(self, element) -> str:
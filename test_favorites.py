@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Test script for the favorites API.
+Run this against a running server to verify favorites round-trip correctly.
+"""
+
+import asyncio
+import sys
+import httpx
+
+# Configuration
+BASE_URL = "http://localhost:8000"  # Change to your deployment URL
+
+# Numeric on purpose: JSON bodies may send item IDs as numbers, while the
+# DELETE route always receives them as path strings
+TEST_ITEM_ID = 987654321012
+
+async def test_numeric_item_id_round_trip() -> bool:
+    """Add a favorite with a numeric item_id, then delete it by its path string."""
+    print("=" * 60)
+    print("Testing favorites round trip with a numeric item_id")
+    print("=" * 60)
+
+    async with httpx.AsyncClient(base_url=BASE_URL) as client:
+        # Clean up anything left over from an earlier run
+        await client.delete(f"/api/favorites/{TEST_ITEM_ID}")
+
+        response = await client.post("/api/favorites", json={"item_id": TEST_ITEM_ID, "title": "Test item"})
+        print(f"\n1. Add favorite: {response.status_code}")
+        if response.status_code != 201:
+            print(f"   ❌ Expected 201, got {response.text}")
+            return False
+
+        response = await client.post("/api/favorites", json={"item_id": str(TEST_ITEM_ID), "title": "Test item"})
+        print(f"2. Add same item as a string: {response.status_code}")
+        if response.status_code != 409:
+            print("   ❌ Expected 409, the numeric and string IDs should be the same favorite")
+            return False
+
+        response = await client.delete(f"/api/favorites/{TEST_ITEM_ID}")
+        print(f"3. Delete favorite: {response.status_code}")
+        if response.status_code != 200:
+            print(f"   ❌ Expected 200, got {response.text}")
+            return False
+
+        favorites = (await client.get("/api/favorites")).json()
+        still_listed = any(str(fav.get("item_id")) == str(TEST_ITEM_ID) for fav in favorites)
+        print(f"4. Listed after delete: {still_listed}")
+        if still_listed:
+            print("   ❌ Deleted favorite is still returned by the list endpoint")
+            return False
+
+        response = await client.delete(f"/api/favorites/{TEST_ITEM_ID}")
+        print(f"5. Delete again: {response.status_code}")
+        if response.status_code != 404:
+            print("   ❌ Expected 404 for an already deleted favorite")
+            return False
+
+    print("\n✅ Favorites round trip passed")
+    return True
+
+async def main():
+    """Run all tests."""
+    passed = await test_numeric_item_id_round_trip()
+    sys.exit(0 if passed else 1)
+
+if __name__ == "__main__":
+    asyncio.run(main())